@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Reproducible load test for the Aimlink Properties API.
+
+Seeds a synthetic catalogue (properties with stored JPEG images and leads)
+into a throwaway MongoDB database, then runs a weighted mix of listing
+reads, detail views, lead bursts and admin edits from concurrent async
+clients. Prints per-endpoint throughput and p50/p95/p99 latency as JSON.
+
+By default the app runs in-process against the seeded database, so only a
+local mongod is needed (e.g. `docker run -p 27017:27017 mongo:7`):
+
+    python benchmarks/load_suite.py --catalogue 10k --output run.json
+    python benchmarks/load_suite.py --catalogue 10k --skip-seed --baseline run.json
+
+In-process runs share one event loop between the clients and the app, so
+absolute numbers include client overhead; compare runs with each other, not
+with production. To load a live server instead, seed the database and blob
+store it uses and pass --base-url:
+
+    MONGO_URL=... DB_NAME=... BLOB_STORE_PATH=... \\
+        python benchmarks/load_suite.py --base-url http://localhost:8001 --mongo-url ... --db ...
+
+Seeding and workload choices are driven by --seed, so two runs with the same
+arguments issue the same requests in the same proportions.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CATALOGUES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+DEFAULT_MIX = "list=40,summary=15,detail=30,lead_burst=10,admin_edit=5"
+
+AREAS = {
+    "Beirut": ["Achrafieh", "Hamra", "Verdun", "Gemmayze", "Mar Mikhael", "Ras Beirut", "Badaro"],
+    "Mount Lebanon": ["Jounieh", "Broummana", "Baabda", "Dbayeh", "Rabieh", "Beit Mery", "Aley"],
+}
+PROPERTY_TYPES = ["Apartment", "Apartment", "Apartment", "Villa", "Office", "Land"]
+VIEWS = ["Sea View", "Mountain View", "City View", "Sea and Mountain View", None]
+STATUS_WEIGHTS = {"active": 85, "draft": 10, "sold": 5}
+LEAD_STATUS_WEIGHTS = {"pending": 60, "contacted": 30, "completed": 10}
+FIRST_NAMES = ["Rami", "Maya", "Karim", "Nour", "Elie", "Lara", "Fadi", "Rita", "Joe", "Yara", "Ziad", "Hala"]
+LAST_NAMES = ["Haddad", "Khoury", "Nassar", "Saad", "Aoun", "Frem", "Gemayel", "Salameh", "Azar", "Daher"]
+
+BATCH_SIZE = 1000
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; expected {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# Seeding
+
+def make_image(rng, width, height, quality):
+    """A photo-sized JPEG; noise over a gradient compresses like a real photo."""
+    base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    tint = Image.new("RGB", (width, height), tuple(rng.randrange(60, 220) for _ in range(3)))
+    # Noise from the seeded generator so the same --seed stores the same blobs
+    noise = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    photo = Image.blend(Image.blend(base, tint, 0.5), noise, 0.2)
+    out = io.BytesIO()
+    photo.save(out, "JPEG", quality=quality)
+    return out.getvalue()
+
+
+def seed_images(store, rng, count):
+    # Blobs are content-addressed, so a pool of distinct photos shared across
+    # properties gives realistic transfer sizes without 100k files
+    sizes = [(1600, 1067), (1280, 960), (2048, 1365), (1024, 768)]
+    keys = []
+    for _ in range(count):
+        width, height = rng.choice(sizes)
+        keys.append(store.put(make_image(rng, width, height, rng.choice([75, 82, 88]))))
+    return keys
+
+
+def make_property(rng, index, image_keys, now):
+    area = rng.choice(list(AREAS))
+    neighbourhood = rng.choice(AREAS[area])
+    property_type = rng.choice(PROPERTY_TYPES)
+    size = rng.randrange(60, 600) if property_type != "Land" else rng.randrange(500, 5000)
+    latitude = round(33.85 + rng.uniform(-0.1, 0.15), 6)
+    longitude = round(35.52 + rng.uniform(-0.05, 0.15), 6)
+    created_at = now - timedelta(minutes=rng.randrange(0, 365 * 24 * 60))
+    residential = property_type in ("Apartment", "Villa")
+    return {
+        "title": f"{property_type} in {neighbourhood} #{index}",
+        "area": area,
+        "location_detail": f"{neighbourhood}, {area}",
+        "price_usd": float(round(size * rng.uniform(1200, 4500), -3)),
+        "property_type": property_type,
+        "size_sqm": float(size),
+        "bedrooms": rng.randrange(1, 6) if residential else None,
+        "bathrooms": rng.randrange(1, 5) if residential else None,
+        "floor_level": f"{rng.randrange(0, 15)}th Floor" if property_type in ("Apartment", "Office") else None,
+        "view_type": rng.choice(VIEWS),
+        "description": " ".join(
+            rng.choice(["Bright", "Spacious", "Renovated", "Quiet", "Modern", "Sunny", "Elegant"])
+            + " " + property_type.lower() + " close to " + rng.choice(AREAS[area]) + "."
+            for _ in range(rng.randrange(3, 8))
+        ),
+        "images": rng.sample(image_keys, min(len(image_keys), rng.randrange(3, 9))),
+        "latitude": latitude,
+        "longitude": longitude,
+        "location": {"type": "Point", "coordinates": [longitude, latitude]},
+        "status": rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0],
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def make_lead(rng, property_id, created_after, now):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    created_at = created_after + (now - created_after) * rng.random()
+    return {
+        "property_id": property_id,
+        "name": name,
+        "name_lower": name.lower(),
+        "phone": f"+961 {rng.choice([3, 70, 71, 76, 81])} {rng.randrange(100000, 999999)}",
+        "message": rng.choice([None, "Is this still available?", "I'd like to schedule a visit."]),
+        "status": rng.choices(list(LEAD_STATUS_WEIGHTS), weights=list(LEAD_STATUS_WEIGHTS.values()))[0],
+        "created_at": created_at,
+    }
+
+
+async def seed(db, store, args):
+    from indexes import ensure_indexes
+    from lead_counters import empty_lead_counts
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    await db.properties.drop()
+    await db.leads.drop()
+    await ensure_indexes(db)
+
+    image_keys = seed_images(store, rng, args.image_pool)
+    now = datetime.utcnow()
+    total = CATALOGUES[args.catalogue]
+    lead_total = 0
+    for offset in range(0, total, BATCH_SIZE):
+        properties, leads = [], []
+        for index in range(offset, min(total, offset + BATCH_SIZE)):
+            prop = make_property(rng, index, image_keys, now)
+            prop["_id"] = ObjectId()
+            prop["lead_counts"] = empty_lead_counts()
+            # Interest is skewed: most listings get a few leads, some get many
+            for _ in range(min(200, int(rng.paretovariate(1.5) * args.leads_per_property / 3))):
+                lead = make_lead(rng, str(prop["_id"]), prop["created_at"], now)
+                prop["lead_counts"]["total"] += 1
+                prop["lead_counts"]["by_status"][lead["status"]] += 1
+                leads.append(lead)
+            properties.append(prop)
+        await db.properties.insert_many(properties, ordered=False)
+        if leads:
+            await db.leads.insert_many(leads, ordered=False)
+        lead_total += len(leads)
+
+    return {
+        "properties": total,
+        "leads": lead_total,
+        "images": len(image_keys),
+        "image_bytes": sum(store.size(key) for key in image_keys),
+        "seed_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+# Workload
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+        self.recording = False
+
+    def _count(self, name, outcome, error):
+        counts = self.statuses.setdefault(name, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if error:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    async def call(self, name, request):
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            # Timeouts and connection failures count as errors, not latency
+            if self.recording:
+                self._count(name, type(e).__name__, True)
+            return None
+        if self.recording:
+            self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+            self._count(name, str(response.status_code), response.status_code >= 400)
+        return response
+
+
+def listing_params(rng):
+    params = {"limit": 20}
+    if rng.random() < 0.5:
+        params["area"] = rng.choice(list(AREAS))
+    if rng.random() < 0.4:
+        params["property_type"] = rng.choice(PROPERTY_TYPES)
+    if rng.random() < 0.3:
+        low = rng.choice([100_000, 250_000, 500_000])
+        params["min_price"] = low
+        params["max_price"] = low * rng.choice([2, 4])
+    return params
+
+
+async def scenario_list(client, rng, recorder, context):
+    response = await recorder.call("get_properties", client.get("/api/properties", params=listing_params(rng)))
+    # A third of visitors scroll to the second page
+    if response is not None and response.status_code == 200 and rng.random() < 0.33:
+        cursor = response.json().get("next_cursor")
+        if cursor:
+            params = {**listing_params(rng), "cursor": cursor}
+            await recorder.call("get_properties_page2", client.get("/api/properties", params=params))
+
+
+async def scenario_summary(client, rng, recorder, context):
+    await recorder.call("get_property_summaries", client.get("/api/properties/summary", params=listing_params(rng)))
+
+
+async def scenario_detail(client, rng, recorder, context):
+    property_id = rng.choice(context["property_ids"])
+    response = await recorder.call("get_property", client.get(f"/api/properties/{property_id}"))
+    if response is not None and response.status_code == 200 and response.json().get("images"):
+        await recorder.call("get_image", client.get(response.json()["images"][0]))
+
+
+async def scenario_lead_burst(client, rng, recorder, context):
+    # Many visitors enquiring about the same few listings at once
+    targets = rng.sample(context["property_ids"], min(3, len(context["property_ids"])))
+    await asyncio.gather(*(
+        recorder.call("create_lead", client.post("/api/leads", json={
+            "property_id": rng.choice(targets),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "phone": f"+961 {rng.choice([3, 70, 71])} {rng.randrange(100000, 999999)}",
+            "message": "Is this still available?",
+        }))
+        for _ in range(context["burst_size"])
+    ))
+
+
+async def scenario_admin_edit(client, rng, recorder, context):
+    headers = {"Authorization": f"Bearer {context['token']}"}
+    await recorder.call("get_admin_properties", client.get(
+        "/api/admin/properties", params={"sort": rng.choice(["created", "leads", "pending_leads"])}, headers=headers
+    ))
+    property_id = rng.choice(context["property_ids"])
+    await recorder.call("update_property", client.put(
+        f"/api/properties/{property_id}",
+        json={"price_usd": float(rng.randrange(100, 2000) * 1000)},
+        headers={**headers, "Prefer": "return=minimal"},
+    ))
+
+
+SCENARIOS = {
+    "list": scenario_list,
+    "summary": scenario_summary,
+    "detail": scenario_detail,
+    "lead_burst": scenario_lead_burst,
+    "admin_edit": scenario_admin_edit,
+}
+
+
+async def worker(client, rng, recorder, context, mix, stop_at):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < stop_at:
+        await SCENARIOS[rng.choices(names, weights=weights)[0]](client, rng, recorder, context)
+
+
+async def admin_token(client, email, password):
+    await client.post("/api/auth/create-admin", params={"email": email, "password": password})
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["token"]
+
+
+async def run_workload(client, db, args):
+    context = {
+        "property_ids": [str(doc["_id"]) async for doc in db.properties.find({"status": "active"}, {"_id": 1})],
+        "token": await admin_token(client, args.email, args.password),
+        "burst_size": args.burst_size,
+    }
+    if not context["property_ids"]:
+        raise SystemExit("No active properties; seed the database first")
+
+    recorder = Recorder()
+    # Sorting makes the sampled ids independent of the database's return order
+    context["property_ids"].sort()
+    rngs = [random.Random(f"{args.seed}-{index}") for index in range(args.concurrency)]
+
+    async def phase(duration):
+        stop_at = time.perf_counter() + duration
+        await asyncio.gather(*(
+            worker(client, rng, recorder, context, args.mix, stop_at) for rng in rngs
+        ))
+
+    if args.warmup:
+        await phase(args.warmup)
+    recorder.recording = True
+    started = time.perf_counter()
+    await phase(args.duration)
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in sorted(recorder.statuses):
+        samples = recorder.latencies.get(name, [])
+        endpoints[name] = {
+            **percentiles(samples),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "errors": recorder.errors.get(name, 0),
+            "statuses": recorder.statuses[name],
+        }
+    requests = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "total": {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2),
+            "errors": sum(recorder.errors.values()),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare(result, baseline):
+    """Relative change per endpoint against a previous run's JSON."""
+    changes = {}
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or not previous.get("count"):
+            continue
+        changes[name] = {
+            key: round((current[key] - previous[key]) / previous[key] * 100, 1) if previous[key] else None
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms") if key in current and key in previous
+        }
+    return changes
+
+
+async def main(args):
+    if args.base_url:
+        from blob_store import create_blob_store
+        transport = None
+    else:
+        # The app reads its configuration at import time
+        os.environ["MONGO_URL"] = args.mongo_url
+        os.environ["DB_NAME"] = args.db
+        os.environ.setdefault("BLOB_STORE_PATH", str(Path(tempfile.gettempdir()) / "aimlink-bench-blobs"))
+        import server
+        from blob_store import create_blob_store
+        transport = httpx.ASGITransport(app=server.app)
+        await server.ensure_indexes(server.db)
+        server.lead_queue.start()
+
+    mongo = AsyncIOMotorClient(args.mongo_url)
+    db = mongo[args.db]
+    result = {
+        "config": {
+            "catalogue": args.catalogue,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "burst_size": args.burst_size,
+            "seed": args.seed,
+            "target": args.base_url or "in-process",
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": datetime.utcnow().isoformat() + "Z",
+        },
+    }
+    try:
+        if not args.skip_seed:
+            result["catalogue"] = await seed(db, create_blob_store(), args)
+            print(f"Seeded {json.dumps(result['catalogue'])}", file=sys.stderr)
+        limits = httpx.Limits(max_connections=args.concurrency * max(1, args.burst_size))
+        async with httpx.AsyncClient(
+            base_url=args.base_url or "http://bench", transport=transport, limits=limits, timeout=60
+        ) as client:
+            result.update(await run_workload(client, db, args))
+    finally:
+        mongo.close()
+        if transport is not None:
+            await server.lead_queue.stop()
+            server.client.close()
+
+    if args.baseline:
+        result["change_vs_baseline_percent"] = compare(result, json.loads(Path(args.baseline).read_text()))
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalogue", choices=list(CATALOGUES), default="1k", help="Number of properties to seed")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the catalogue already in --db")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="aimlink_bench", help="Database to seed; its properties and leads are replaced")
+    parser.add_argument("--base-url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--email", default="bench@aimlinkproperties.com")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--leads-per-property", type=float, default=3.0, help="Average leads seeded per property")
+    parser.add_argument("--image-pool", type=int, default=40, help="Distinct photos shared across listings")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--burst-size", type=int, default=10, help="Concurrent lead posts per burst")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--baseline", help="Previous result JSON to report relative changes against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Login burst benchmark for Aimlink Properties.
+
+Measures latency of public property reads while a burst of concurrent admin
+logins is in flight, to check that bcrypt work no longer stalls the event
+loop. Run against a live server, e.g.:
+
+    python benchmarks/login_burst.py --base-url http://localhost:8001
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+async def reader(client, stop_at, latencies):
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        response = await client.get("/api/properties/summary", params={"limit": 20})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def login(client, email, password, latencies, statuses):
+    started = time.perf_counter()
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    latencies.append(time.perf_counter() - started)
+    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run_reads(client, readers, duration):
+    latencies = []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(reader(client, stop_at, latencies) for _ in range(readers)))
+    return latencies
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        baseline = await run_reads(client, args.readers, args.duration)
+
+        login_latencies, statuses = [], {}
+        burst_reads, _ = await asyncio.gather(
+            run_reads(client, args.readers, args.duration),
+            asyncio.gather(*(
+                login(client, args.email, args.password, login_latencies, statuses)
+                for _ in range(args.logins)
+            )),
+        )
+
+    print(json.dumps({
+        "readers": args.readers,
+        "burst_logins": args.logins,
+        "reads_baseline": percentiles(baseline),
+        "reads_during_login_burst": percentiles(burst_reads),
+        "login_latency": percentiles(login_latencies),
+        "login_statuses": statuses,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--email", default="admin@aimlinkproperties.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent public read loops")
+    parser.add_argument("--logins", type=int, default=20, help="Logins fired at once during the burst")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per read phase")
+    asyncio.run(main(parser.parse_args()))
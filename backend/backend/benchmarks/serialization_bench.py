@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Serialization micro-benchmark for property list responses.
+
+Compares the per-row cost of the previous path (build a PropertyResponse per
+Mongo row, then let FastAPI re-validate the page through response_model and
+encode it with json.dumps) against the current path (plain dicts from trusted
+rows encoded once with orjson). No database is needed:
+
+    python benchmarks/serialization_bench.py --rows 1000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import PropertyPage, PropertyResponse, image_url, property_to_dict  # noqa: E402
+from serialization import dumps  # noqa: E402
+
+
+def make_rows(count):
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Apartment {i} in Achrafieh",
+            "area": "Beirut" if i % 2 else "Mount Lebanon",
+            "location_detail": "Achrafieh, Sassine Square",
+            "price_usd": 250000.0 + i,
+            "property_type": "Apartment",
+            "size_sqm": 180.0,
+            "bedrooms": 3,
+            "bathrooms": 2,
+            "floor_level": "5th Floor",
+            "view_type": "Sea View",
+            "description": "Bright apartment with open-plan living and a large terrace. " * 4,
+            "images": [f"{i:060x}{n:04x}" for n in range(5)],
+            "latitude": 33.89,
+            "longitude": 35.50,
+            "status": "active",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+page_adapter = TypeAdapter(PropertyPage)
+
+
+def pydantic_path(rows):
+    page = PropertyPage(
+        items=[
+            PropertyResponse(
+                id=str(prop["_id"]),
+                **{
+                    k: ([image_url(img) for img in v] if k == "images" else v)
+                    for k, v in prop.items() if k not in ("_id",)
+                }
+            )
+            for prop in rows
+        ],
+        next_cursor=None,
+    )
+    # What FastAPI does with response_model: validate, dump to JSON types, json.dumps
+    validated = page_adapter.validate_python(page.model_dump())
+    content = page_adapter.dump_python(validated, mode="json")
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(rows):
+    return dumps({"items": [property_to_dict(prop) for prop in rows], "next_cursor": None})
+
+
+def bench(fn, rows, repeat):
+    fn(rows)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(args):
+    rows = make_rows(args.rows)
+    slow = bench(pydantic_path, rows, args.repeat)
+    fast = bench(fast_path, rows, args.repeat)
+    print(json.dumps({
+        "rows": args.rows,
+        "pydantic_response_model": {"total_ms": round(slow * 1000, 2), "per_row_us": round(slow / args.rows * 1e6, 2)},
+        "orjson_fast_path": {"total_ms": round(fast * 1000, 2), "per_row_us": round(fast / args.rows * 1e6, 2)},
+        "speedup": round(slow / fast, 2),
+        "body_bytes": len(fast_path(rows)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
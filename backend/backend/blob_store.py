@@ -0,0 +1,217 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+CHUNK_SIZE = 64 * 1024
+# Origin prefixed to image URLs in API responses. When empty, URLs are
+# relative (/api/images/...) and clients anchor them to the backend they
+# called; the Expo app does this in utils/images.ts.
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+
+# Images are addressed by the hex sha256 of their decoded bytes
+BLOB_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+BLOB_URL_RE = re.compile(r"/api/images/([0-9a-f]{64})(?:[/?#].*)?$")
+VARIANT_NAME_RE = re.compile(r"^[a-z]+$")
+DATA_URI_RE = re.compile(r"^data:(?P<mime>[\w/+.-]+)?(?:;[\w=.-]+)*;base64,", re.IGNORECASE)
+
+
+class BlobError(ValueError):
+    pass
+
+
+def blob_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_blob_key(value: str) -> bool:
+    return bool(BLOB_KEY_RE.match(value))
+
+
+def image_url(image: str, variant: Optional[str] = None, base_url: Optional[str] = None) -> str:
+    """URL for a stored image (or one of its variants); inline base64 from before the blob store passes through."""
+    if not is_blob_key(image):
+        return image
+    base = PUBLIC_BASE_URL if base_url is None else base_url.rstrip("/")
+    return f"{base}/api/images/{image}/{variant}" if variant else f"{base}/api/images/{image}"
+
+
+def blob_key_from_ref(value: str) -> Optional[str]:
+    """Return the key for a bare key or an /api/images URL, else None."""
+    value = value.strip()
+    url_match = BLOB_URL_RE.search(value)
+    key = url_match.group(1) if url_match else value
+    return key if is_blob_key(key) else None
+
+
+def decode_image(value: str) -> bytes:
+    """Decode a data URI or bare base64 string into raw image bytes."""
+    match = DATA_URI_RE.match(value)
+    payload = value[match.end():] if match else value
+    try:
+        return base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError):
+        raise BlobError("Image is not valid base64")
+
+
+def sniff_content_type(head: bytes) -> str:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class BlobStore(ABC):
+    """Content-addressed storage for binary blobs keyed by their sha256.
+
+    A blob may have named variants (e.g. resized renditions) stored next to
+    it; pass ``variant`` to address one instead of the original.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        ...
+
+    @abstractmethod
+    def put_variant(self, key: str, variant: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def exists(self, key: str, variant: Optional[str] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def size(self, key: str, variant: Optional[str] = None) -> int:
+        ...
+
+    @abstractmethod
+    def read_head(self, key: str, length: int = 16, variant: Optional[str] = None) -> bytes:
+        ...
+
+    @abstractmethod
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE,
+                    variant: Optional[str] = None) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str, variant: Optional[str] = None) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str, variant: Optional[str] = None) -> Path:
+        if not is_blob_key(key):
+            raise BlobError("Invalid blob key")
+        if variant is not None and not VARIANT_NAME_RE.match(variant):
+            raise BlobError("Invalid variant name")
+        name = f"{key}.{variant}" if variant else key
+        return self.root / key[:2] / key[2:4] / name
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob.
+        # The name is unique per call: two threads storing the same
+        # content-addressed key must not share a temp file.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def put(self, data: bytes) -> str:
+        key = blob_key(data)
+        path = self._path(key)
+        if not path.exists():
+            self._write(path, data)
+        return key
+
+    def put_variant(self, key: str, variant: str, data: bytes) -> None:
+        self._write(self._path(key, variant), data)
+
+    def exists(self, key: str, variant: Optional[str] = None) -> bool:
+        return self._path(key, variant).exists()
+
+    def size(self, key: str, variant: Optional[str] = None) -> int:
+        return self._path(key, variant).stat().st_size
+
+    def read_head(self, key: str, length: int = 16, variant: Optional[str] = None) -> bytes:
+        with open(self._path(key, variant), "rb") as f:
+            return f.read(length)
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE,
+                    variant: Optional[str] = None) -> Iterator[bytes]:
+        with open(self._path(key, variant), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def delete(self, key: str, variant: Optional[str] = None) -> None:
+        try:
+            self._path(key, variant).unlink()
+        except FileNotFoundError:
+            pass
+
+
+BLOB_BACKENDS: Dict[str, Type[BlobStore]] = {
+    "local": LocalBlobStore,
+}
+
+
+def create_blob_store(backend: Optional[str] = None, root: Optional[str] = None) -> BlobStore:
+    backend = backend or os.getenv("BLOB_STORE_BACKEND", "local")
+    if backend not in BLOB_BACKENDS:
+        raise BlobError(f"Unknown blob store backend: {backend}")
+    root = root or os.getenv("BLOB_STORE_PATH", str(Path(__file__).parent / "blobs"))
+    return BLOB_BACKENDS[backend](Path(root))
+
+
+def resolve_image(store: BlobStore, value: str, policy=None) -> Tuple[str, Optional[bytes]]:
+    """Resolve an incoming image reference to ``(key, data)`` without storing it.
+
+    Accepts an existing key, an image URL previously handed out by the API,
+    or a base64/data-URI payload. ``data`` is None when the image is already
+    stored. A ``policy`` (see image_validation.ImagePolicy) vets new payloads.
+    """
+    value = value.strip()
+    key = blob_key_from_ref(value)
+    if key is not None:
+        if not store.exists(key):
+            raise BlobError("Referenced image does not exist")
+        return key, None
+    if policy is not None:
+        policy.check_encoded(value)
+    data = decode_image(value)
+    if not data:
+        raise BlobError("Image is empty")
+    if policy is not None:
+        policy.check_image(data)
+    key = blob_key(data)
+    # Content addressing makes re-uploads of a stored photo free
+    return key, (None if store.exists(key) else data)
+
+
+def store_image(store: BlobStore, value: str, policy=None) -> str:
+    """Normalise an incoming image reference to a blob key, storing new payloads once."""
+    key, data = resolve_image(store, value, policy)
+    if data is not None:
+        store.put(data)
+    return key
@@ -0,0 +1,228 @@
+import csv
+import io
+import json
+import os
+import re
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, List, Optional, Tuple
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_MAX_ERRORS = int(os.getenv("BULK_MAX_ERRORS", "100"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+# Encoded rows are flushed to the client once this many bytes have built up
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+# Longer import lines are reported as row errors instead of being buffered
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(8 * 1024 * 1024)))
+
+BULK_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# CSV cells are strings; these columns are converted before validation
+CSV_INT_FIELDS = {"bedrooms", "bathrooms"}
+CSV_FLOAT_FIELDS = {"price_usd", "size_sqm", "latitude", "longitude"}
+CSV_LIST_SEPARATOR = "|"
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Phone numbers and signed numbers can't call functions, so they export as-is
+CSV_SAFE_TEXT = re.compile(r"[+-]?[\d\s().-]+")
+
+# (row number, parsed row or None, parse error or None)
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+class BulkFormatError(ValueError):
+    pass
+
+
+def resolve_format(requested: Optional[str], content_type: Optional[str] = None) -> str:
+    """Pick ndjson or csv from an explicit ?format= or the Content-Type header."""
+    if requested:
+        if requested not in BULK_FORMATS:
+            raise BulkFormatError(f"Unsupported format '{requested}', expected ndjson or csv")
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int = BULK_MAX_LINE_BYTES
+                     ) -> AsyncIterator[Optional[bytes]]:
+    """Split a byte stream into raw lines without buffering the whole body.
+
+    Only each new chunk is searched for newlines. A line longer than
+    ``max_line_bytes`` is dropped as it streams in and yielded as None.
+    Lines are not decoded here, so one bad line cannot end the stream.
+    """
+    pending = bytearray()
+    overflow = False
+    async for chunk in chunks:
+        *lines, tail = chunk.split(b"\n")
+        for part in lines:
+            if overflow:
+                overflow = False
+                yield None
+                continue
+            pending += part
+            line = bytes(pending)
+            pending.clear()
+            yield None if len(line) > max_line_bytes else line
+        if not overflow:
+            pending += tail
+            if len(pending) > max_line_bytes:
+                pending.clear()
+                overflow = True
+    if overflow:
+        yield None
+    elif pending:
+        yield bytes(pending)
+
+
+def decode_line(line: Optional[bytes], max_line_bytes: int = BULK_MAX_LINE_BYTES) -> str:
+    """Decode one line from iter_lines; raises ValueError for oversized or non-UTF-8 lines."""
+    if line is None:
+        raise ValueError(f"Line exceeds {max_line_bytes} bytes")
+    try:
+        return line.rstrip(b"\r").decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Invalid UTF-8 at byte {e.start}") from None
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[ParsedRow]:
+    row_number = 0
+    async for raw in iter_lines(chunks):
+        if raw is not None and not raw.strip():
+            continue
+        row_number += 1
+        try:
+            line = decode_line(raw)
+        except ValueError as e:
+            yield row_number, None, str(e)
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, row, None
+
+
+def _coerce_csv_row(row: dict) -> dict:
+    values = {}
+    for field, value in row.items():
+        value = (value or "").strip()
+        if _is_guarded(value):
+            # Undo the quote export_rows put in front of formula-like text
+            value = value[1:]
+        if field == "images":
+            values[field] = [image for image in value.split(CSV_LIST_SEPARATOR) if image]
+        elif not value:
+            continue
+        elif field in CSV_INT_FIELDS:
+            values[field] = _convert(field, value, int, "an integer")
+        elif field in CSV_FLOAT_FIELDS:
+            values[field] = _convert(field, value, float, "a number")
+        else:
+            values[field] = value
+    return values
+
+
+def _convert(field: str, value: str, kind: Callable[[str], object], expected: str):
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(f"{field}: expected {expected}, got '{value}'") from None
+
+
+async def parse_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[ParsedRow]:
+    header: Optional[List[str]] = None
+    record = ""
+    row_number = 0
+    async for raw in iter_lines(chunks):
+        try:
+            line = decode_line(raw)
+        except ValueError as e:
+            # Drop the record this line belongs to and resync on the next one
+            row_number += 1
+            record = ""
+            yield row_number, None, str(e)
+            continue
+        # A quoted cell may span lines; keep reading until the quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        cells = next(csv.reader([text]))
+        if header is None:
+            header = [cell.strip() for cell in cells]
+            continue
+        row_number += 1
+        if len(cells) > len(header):
+            yield row_number, None, "Row has more cells than the header"
+            continue
+        try:
+            yield row_number, _coerce_csv_row(dict(zip(header, cells))), None
+        except ValueError as e:
+            yield row_number, None, str(e)
+    if record:
+        yield row_number + 1, None, "Unterminated quoted field"
+
+
+def parse_rows(fmt: str, chunks: AsyncIterable[bytes]) -> AsyncIterator[ParsedRow]:
+    return parse_csv(chunks) if fmt == "csv" else parse_ndjson(chunks)
+
+
+def _csv_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return _neutralise_formula(CSV_LIST_SEPARATOR.join(str(item) for item in value))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        # Negative numbers are data, not formulas
+        return str(value)
+    return _neutralise_formula(str(value))
+
+
+def _neutralise_formula(text: str) -> str:
+    # Exported text can come from the public contact form; spreadsheets run
+    # any cell starting with one of these as a formula. Text that already
+    # looks guarded gets another quote so parse_csv gives it back unchanged.
+    formula = text.startswith(CSV_FORMULA_PREFIXES) and not CSV_SAFE_TEXT.fullmatch(text)
+    return f"'{text}" if formula or _is_guarded(text) else text
+
+
+def _is_guarded(text: str) -> bool:
+    return text.startswith("'") and text.lstrip("'").startswith(CSV_FORMULA_PREFIXES)
+
+
+async def export_rows(cursor, to_dict: Callable[[dict], dict], fmt: str,
+                      fields: Iterable[str], dumps: Callable[[dict], bytes]) -> AsyncIterator[bytes]:
+    """Encode documents from a Motor cursor, yielding bounded chunks."""
+    fields = list(fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    chunk = bytearray()
+    if fmt == "csv":
+        writer.writerow(fields)
+    async for doc in cursor.batch_size(EXPORT_BATCH_SIZE):
+        row = to_dict(doc)
+        if fmt == "csv":
+            writer.writerow([_csv_cell(row.get(field)) for field in fields])
+        else:
+            chunk += dumps({field: row.get(field) for field in fields}) + b"\n"
+        if buffer.tell():
+            chunk += buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if len(chunk) >= EXPORT_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if buffer.tell():
+        chunk += buffer.getvalue().encode()
+    if chunk:
+        yield bytes(chunk)
@@ -0,0 +1,151 @@
+import asyncio
+import math
+import os
+from typing import List, Optional, Tuple
+
+from geo import bbox_query
+
+MAX_ZOOM = 20
+# Grid cells per 256px map tile edge; 4 gives roughly 64px clusters on screen
+CELLS_PER_TILE = int(os.getenv("CLUSTER_CELLS_PER_TILE", "4"))
+# Most grid cells one bbox may span, which bounds the clusters per response.
+# A 2048px-square viewport at 4 cells per tile spans 32x32.
+MAX_BBOX_CELLS = int(os.getenv("CLUSTER_MAX_BBOX_CELLS", "1024"))
+# Whole-collection clusters are cached per zoom up to this level; finer
+# grids approach one cluster per property, so they are built per tile
+CLUSTER_CACHE_MAX_ZOOM = int(os.getenv("CLUSTER_CACHE_MAX_ZOOM", "8"))
+# Above that, clusters are built and cached per tile of TILE_CELLS x
+# TILE_CELLS grid cells. Tiles are aligned to the grid, so a viewport is
+# answered from the few tiles it overlaps and a pan only builds new ones.
+TILE_CELLS = int(os.getenv("CLUSTER_TILE_CELLS", "16"))
+
+# (first x, first y, end x, end y) grid cell indexes, end exclusive
+CellRange = Tuple[int, int, int, int]
+
+
+def clamp_zoom(zoom: int) -> int:
+    return max(0, min(zoom, MAX_ZOOM))
+
+
+def cell_size(zoom: int) -> float:
+    """Grid cell edge in degrees for a web-mercator zoom level."""
+    return 360.0 / (2 ** clamp_zoom(zoom)) / CELLS_PER_TILE
+
+
+def bbox_cells(zoom: int, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> int:
+    """Number of grid cells at ``zoom`` that the bbox touches."""
+    size = cell_size(zoom)
+    columns = math.floor((max_lng + 180) / size) - math.floor((min_lng + 180) / size) + 1
+    rows = math.floor((max_lat + 90) / size) - math.floor((min_lat + 90) / size) + 1
+    return columns * rows
+
+
+def fit_zoom(zoom: int, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> int:
+    """The requested zoom, lowered until the bbox spans at most MAX_BBOX_CELLS cells.
+
+    A high zoom with a continent-sized bbox does not match any real
+    viewport and would return one cluster per property.
+    """
+    zoom = clamp_zoom(zoom)
+    while zoom > 0 and bbox_cells(zoom, min_lat, min_lng, max_lat, max_lng) > MAX_BBOX_CELLS:
+        zoom -= 1
+    return zoom
+
+
+def tiles_in_bbox(zoom: int, min_lat: float, min_lng: float,
+                  max_lat: float, max_lng: float) -> List[Tuple[int, int]]:
+    """Tiles at ``zoom`` that the bbox overlaps, as (x, y) tile indexes."""
+    span = cell_size(zoom) * TILE_CELLS
+    first_x, last_x = math.floor((min_lng + 180) / span), math.floor((max_lng + 180) / span)
+    first_y, last_y = math.floor((min_lat + 90) / span), math.floor((max_lat + 90) / span)
+    return [(x, y) for x in range(first_x, last_x + 1) for y in range(first_y, last_y + 1)]
+
+
+def tile_cells(tile: Tuple[int, int]) -> CellRange:
+    x, y = tile
+    return x * TILE_CELLS, y * TILE_CELLS, (x + 1) * TILE_CELLS, (y + 1) * TILE_CELLS
+
+
+def tile_bbox(zoom: int, tile: Tuple[int, int]) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lng, max_lat, max_lng) of a tile, padded by one cell.
+
+    The padding keeps points on a tile edge in the geo match despite float
+    rounding; tile_cells() then decides which tile owns each cell.
+    """
+    size = cell_size(zoom)
+    first_x, first_y, end_x, end_y = tile_cells(tile)
+    return (
+        max(-90.0, first_y * size - 90 - size), max(-180.0, first_x * size - 180 - size),
+        min(90.0, end_y * size - 90 + size), min(180.0, end_x * size - 180 + size),
+    )
+
+
+def cluster_pipeline(zoom: int, match: dict, cells: Optional[CellRange] = None) -> List[dict]:
+    size = cell_size(zoom)
+    pipeline = [
+        {"$match": {"location": {"$exists": True}, **match}},
+        {"$group": {
+            "_id": {
+                "x": {"$floor": {"$divide": [{"$add": ["$longitude", 180]}, size]}},
+                "y": {"$floor": {"$divide": [{"$add": ["$latitude", 90]}, size]}},
+            },
+            "count": {"$sum": 1},
+            "latitude": {"$avg": "$latitude"},
+            "longitude": {"$avg": "$longitude"},
+            "min_price": {"$min": "$price_usd"},
+            "max_price": {"$max": "$price_usd"},
+            "property_id": {"$first": "$_id"},
+        }},
+    ]
+    if cells is not None:
+        first_x, first_y, end_x, end_y = cells
+        pipeline.append({"$match": {
+            "_id.x": {"$gte": first_x, "$lt": end_x},
+            "_id.y": {"$gte": first_y, "$lt": end_y},
+        }})
+    return pipeline
+
+
+async def build_clusters(collection, zoom: int, match: dict, cells: Optional[CellRange] = None) -> List[dict]:
+    """Cluster every matching property on the grid for ``zoom``, optionally only within ``cells``."""
+    clusters = []
+    async for group in collection.aggregate(cluster_pipeline(zoom, match, cells)):
+        clusters.append({
+            "latitude": group["latitude"],
+            "longitude": group["longitude"],
+            "count": group["count"],
+            "min_price": group["min_price"],
+            "max_price": group["max_price"],
+            # Single-property clusters link straight to the listing
+            "property_id": str(group["property_id"]) if group["count"] == 1 else None,
+        })
+    return clusters
+
+
+async def build_tile_clusters(collection, zoom: int, tile: Tuple[int, int], match: dict) -> List[dict]:
+    """Clusters for the grid cells of one tile; the same groups build_clusters finds there."""
+    return await build_clusters(collection, zoom, {**match, **bbox_query(*tile_bbox(zoom, tile))}, tile_cells(tile))
+
+
+async def clusters_for_tiles(cache, collection, zoom: int, tiles: List[Tuple[int, int]],
+                             status: str) -> List[dict]:
+    """Clusters of every tile, reading each from ``cache`` and building the misses concurrently."""
+    found = {tile: cache.get((zoom, status, tile)) for tile in tiles}
+    missing = [tile for tile, clusters in found.items() if clusters is None]
+    if missing:
+        version = cache.version()
+        built = await asyncio.gather(*(
+            build_tile_clusters(collection, zoom, tile, {"status": status}) for tile in missing
+        ))
+        for tile, clusters in zip(missing, built):
+            cache.set((zoom, status, tile), clusters, version=version)
+            found[tile] = clusters
+    return [cluster for tile in tiles for cluster in found[tile]]
+
+
+def clusters_in_bbox(clusters: List[dict], min_lat: float, min_lng: float,
+                     max_lat: float, max_lng: float) -> List[dict]:
+    return [
+        cluster for cluster in clusters
+        if min_lat <= cluster["latitude"] <= max_lat and min_lng <= cluster["longitude"] <= max_lng
+    ]
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Dict, List
+
+PROPERTY_STATS_PIPELINE = [
+    {"$facet": {
+        "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+        "by_area": [{"$group": {"_id": "$area", "count": {"$sum": 1}}}],
+        "by_type": [{"$group": {"_id": "$property_type", "count": {"$sum": 1}}}],
+    }},
+]
+
+LEAD_STATS_PIPELINE = [
+    {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+]
+
+
+def _counts(groups: List[dict]) -> Dict[str, int]:
+    return {str(group["_id"]): group["count"] for group in groups if group["_id"] is not None}
+
+
+async def compute_dashboard_stats(db) -> dict:
+    """Compute dashboard counters with one aggregation per collection, run concurrently."""
+    property_result, lead_groups = await asyncio.gather(
+        db.properties.aggregate(PROPERTY_STATS_PIPELINE).to_list(1),
+        db.leads.aggregate(LEAD_STATS_PIPELINE).to_list(None),
+    )
+    facets = property_result[0] if property_result else {}
+    by_status = _counts(facets.get("by_status", []))
+    leads_by_status = _counts(lead_groups)
+    return {
+        "total_properties": sum(g["count"] for g in facets.get("by_status", [])),
+        "active_properties": by_status.get("active", 0),
+        "draft_properties": by_status.get("draft", 0),
+        "sold_properties": by_status.get("sold", 0),
+        "pending_leads": leads_by_status.get("pending", 0),
+        "total_leads": sum(g["count"] for g in lead_groups),
+        "properties_by_area": _counts(facets.get("by_area", [])),
+        "properties_by_type": _counts(facets.get("by_type", [])),
+        "leads_by_status": leads_by_status,
+    }
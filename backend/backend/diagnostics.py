@@ -0,0 +1,296 @@
+import asyncio
+import cProfile
+import contextvars
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from pymongo import monitoring
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from indexes import summarize_explain
+from metrics import route_label
+from serialization import dumps
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument is optional; cProfile is used without it
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+
+PROFILE_HEADER = "x-debug-profile"
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(Path(__file__).parent / "profiles")))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+# Commands whose plan can be explained; writes and cursor continuations cannot
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+# Session and cluster bookkeeping the driver adds; explain rejects them
+DRIVER_FIELDS = ("lsid", "txnNumber", "autocommit", "startTransaction", "readConcern")
+
+# Mongo commands issued while handling the current request. Motor copies the
+# context into its executor threads, so the command listener sees this too.
+request_commands: contextvars.ContextVar[Optional[List[dict]]] = contextvars.ContextVar(
+    "request_commands", default=None
+)
+
+
+def query_shape(value):
+    """Replace literal values with "?" so queries differing only in values look the same."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def command_shape(command_name: str, command: dict) -> Optional[dict]:
+    if command_name == "find":
+        return {"filter": query_shape(command.get("filter", {})), "sort": list(command.get("sort", {}))}
+    if command_name == "aggregate":
+        # Keep stage names and the shape of each stage's arguments
+        return {"pipeline": [query_shape(stage) for stage in command.get("pipeline", [])]}
+    if command_name in ("count", "distinct"):
+        return {"filter": query_shape(command.get("query", {}))}
+    if command_name == "findAndModify":
+        return {"filter": query_shape(command.get("query", {}))}
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes", [])
+        return {"filter": query_shape(statements[0].get("q", {}))} if statements else None
+    return None
+
+
+def explainable(command_name: str, command: dict) -> Optional[dict]:
+    if command_name not in EXPLAINABLE_COMMANDS:
+        return None
+    if command_name == "aggregate" and any(
+        "$out" in stage or "$merge" in stage for stage in command.get("pipeline", [])
+    ):
+        return None
+    return {key: value for key, value in command.items() if not key.startswith("$") and key not in DRIVER_FIELDS}
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Collects the Mongo commands issued by the request being handled.
+
+    Only active inside SlowRequestMiddleware; commands issued outside a
+    request (startup, background tasks) are ignored.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        commands = request_commands.get()
+        if commands is None:
+            return
+        collection = event.command.get(event.command_name)
+        record = {
+            "database": event.database_name,
+            "collection": collection if isinstance(collection, str) else event.command.get("collection", "-"),
+            "command": event.command_name,
+            "shape": command_shape(event.command_name, event.command),
+            # Only reads are kept whole, for explain; holding every command
+            # would pin each bulk insert's documents for the whole request
+            "explain": explainable(event.command_name, event.command),
+            "ms": None,
+        }
+        commands.append(record)
+        with self._lock:
+            self._inflight[(event.request_id, event.connection_id)] = record
+
+    def _finish(self, event) -> None:
+        with self._lock:
+            record = self._inflight.pop((event.request_id, event.connection_id), None)
+        if record is not None:
+            record["ms"] = round(event.duration_micros / 1000, 2)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+
+def _cursor_explain(explain: dict) -> dict:
+    # Aggregations that push their $match down report the query plan under
+    # the first stage's $cursor
+    stages = explain.get("stages")
+    if stages and "$cursor" in stages[0]:
+        return stages[0]["$cursor"]
+    return explain
+
+
+class SlowRequestMiddleware:
+    """Logs requests slower than ``threshold_ms`` with the Mongo commands they ran.
+
+    For a sampled fraction of slow requests the slowest explainable command
+    is re-run under explain("executionStats") in the background, logging
+    documents examined against documents returned.
+    """
+
+    def __init__(self, app: ASGIApp, client, threshold_ms: float = SLOW_REQUEST_MS,
+                 explain_rate: float = SLOW_QUERY_EXPLAIN_RATE):
+        self.app = app
+        self.client = client
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+        # The loop only keeps weak references to tasks; hold explains until done
+        self._explain_tasks: Set[asyncio.Task] = set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.threshold_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        commands: List[dict] = []
+        token = request_commands.set(commands)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_commands.reset(token)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self.report(f"{scope['method']} {route_label(scope)}", elapsed_ms, status, commands)
+
+    def report(self, route: str, elapsed_ms: float, status: int, commands: List[dict]) -> None:
+        logger.warning(
+            "Slow request %s took %.0fms (status %s, %d Mongo commands, %.0fms in Mongo): %s",
+            route, elapsed_ms, status, len(commands),
+            sum(record["ms"] or 0 for record in commands),
+            dumps([
+                {key: record[key] for key in ("collection", "command", "ms", "shape")}
+                for record in commands
+            ]).decode(),
+        )
+        if not commands or random.random() >= self.explain_rate:
+            return
+        candidates = [record for record in commands if record["ms"] is not None and record["explain"]]
+        if candidates:
+            record = max(candidates, key=lambda candidate: candidate["ms"])
+            task = asyncio.create_task(self.explain(route, record, record["explain"]))
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+
+    async def explain(self, route: str, record: dict, command: dict) -> None:
+        # The task inherited the request's context; keep the explain itself
+        # out of its command list
+        request_commands.set(None)
+        try:
+            explain = await self.client[record["database"]].command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+        except Exception as e:
+            logger.warning("Could not explain slow query from %s: %s", route, e)
+            return
+        summary = summarize_explain(_cursor_explain(explain))
+        logger.warning(
+            "Slow query from %s: %s.%s %s examined %s docs / %s keys, returned %s (index: %s%s)",
+            route, record["collection"], record["command"], dumps(record["shape"]).decode(),
+            summary["docs_examined"], summary["keys_examined"], summary["returned"],
+            summary["index"] or "none", ", collection scan" if summary["collection_scan"] else "",
+        )
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry ``X-Debug-Profile`` from an authenticated admin.
+
+    Uses pyinstrument in async mode when it is installed, otherwise cProfile.
+    cProfile sees the whole event loop thread, so concurrent requests show
+    up in its output. Profiles are written to ``directory``, which keeps the
+    newest ``max_files``; the file name is returned in ``X-Profile-Id``.
+    """
+
+    def __init__(self, app: ASGIApp, is_admin: Callable[[str], Awaitable[bool]],
+                 directory: Path = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES,
+                 enabled: bool = PROFILING_ENABLED):
+        self.app = app
+        self.is_admin = is_admin
+        self.directory = directory
+        self.max_files = max_files
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or not await self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = "{}-{}-{}".format(
+            datetime.utcnow().strftime("%Y%m%dT%H%M%S%f"), scope["method"],
+            re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80],
+        )
+        name += ".html" if Profiler is not None else ".pstats"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", name)
+            await send(message)
+
+        if Profiler is not None:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.stop()
+            await run_in_threadpool(self.write, name, profiler.output_html().encode())
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.disable()
+            await run_in_threadpool(self.write_pstats, name, profiler)
+
+    async def wants_profile(self, scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) not in ("1", "true"):
+            return False
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and bool(token) and await self.is_admin(token)
+
+    def write_pstats(self, name: str, profiler: cProfile.Profile) -> None:
+        profiler.dump_stats(str(self._prepare() / name))
+        self._rotate()
+
+    def write(self, name: str, data: bytes) -> None:
+        (self._prepare() / name).write_bytes(data)
+        self._rotate()
+
+    def _prepare(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory
+
+    def _rotate(self) -> None:
+        # Names start with a UTC timestamp, so sorting them is oldest first
+        files = sorted(path for path in self.directory.iterdir() if path.is_file())
+        for path in files[:max(0, len(files) - self.max_files)]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,56 @@
+import os
+from typing import Optional
+
+GEO_MAX_RESULTS = int(os.getenv("GEO_MAX_RESULTS", "500"))
+
+
+class InvalidGeoQuery(ValueError):
+    pass
+
+
+def geo_point(latitude: Optional[float], longitude: Optional[float]) -> Optional[dict]:
+    """GeoJSON point for a property, or None when either coordinate is missing."""
+    if latitude is None or longitude is None:
+        return None
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+def _check_point(latitude: float, longitude: float) -> None:
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise InvalidGeoQuery("Coordinates out of range")
+
+
+def near_query(latitude: float, longitude: float, radius_m: float) -> dict:
+    _check_point(latitude, longitude)
+    if radius_m <= 0:
+        raise InvalidGeoQuery("Radius must be positive")
+    # $near returns results ordered by distance from the centre
+    return {"location": {"$near": {
+        "$geometry": geo_point(latitude, longitude),
+        "$maxDistance": radius_m,
+    }}}
+
+
+def check_bbox(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> None:
+    _check_point(min_lat, min_lng)
+    _check_point(max_lat, max_lng)
+    if min_lat >= max_lat or min_lng >= max_lng:
+        raise InvalidGeoQuery("Bounding box must have min < max")
+
+
+def bbox_query(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> dict:
+    check_bbox(min_lat, min_lng, max_lat, max_lng)
+    ring = [
+        [min_lng, min_lat],
+        [max_lng, min_lat],
+        [max_lng, max_lat],
+        [min_lng, max_lat],
+        [min_lng, min_lat],
+    ]
+    return {"location": {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [ring]}}}}
+
+
+def clamp_geo_limit(limit: Optional[int]) -> int:
+    if not limit:
+        return GEO_MAX_RESULTS
+    return max(1, min(limit, GEO_MAX_RESULTS))
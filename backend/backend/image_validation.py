@@ -0,0 +1,177 @@
+import os
+import struct
+from typing import Iterable, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from blob_store import DATA_URI_RE, BlobError, sniff_content_type
+
+
+class ImageTooLarge(BlobError):
+    pass
+
+
+def image_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from a PNG, JPEG or WebP header without decoding pixels."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data.startswith(b"\xff\xd8\xff"):
+        return _jpeg_dimensions(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def _jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    # Walk the marker segments until a start-of-frame carries the size
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        (length,) = struct.unpack(">H", data[i + 2:i + 4])
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+class ImagePolicy:
+    """Upload limits for property images.
+
+    Base64 payloads are sized from their encoded length before anything is
+    decoded, so an oversized upload is rejected without allocating it.
+    """
+
+    def __init__(self, max_image_bytes: int, max_property_bytes: int, max_images: int,
+                 max_dimension: int, min_dimension: int, allowed_types: Iterable[str]):
+        self.max_image_bytes = max_image_bytes
+        self.max_property_bytes = max_property_bytes
+        self.max_images = max_images
+        self.max_dimension = max_dimension
+        self.min_dimension = min_dimension
+        self.allowed_types = tuple(allowed_types)
+
+    @property
+    def max_request_bytes(self) -> int:
+        # Base64 inflates by 4/3; leave room for the other JSON fields
+        return self.max_property_bytes * 4 // 3 + 64 * 1024
+
+    def check_encoded(self, value: str) -> None:
+        match = DATA_URI_RE.match(value)
+        encoded_length = len(value) - (match.end() if match else 0)
+        if encoded_length * 3 // 4 > self.max_image_bytes + 2:
+            raise ImageTooLarge(f"Image exceeds {self.max_image_bytes // 1024} KB")
+
+    def check_image(self, data: bytes) -> None:
+        if len(data) > self.max_image_bytes:
+            raise ImageTooLarge(f"Image exceeds {self.max_image_bytes // 1024} KB")
+        content_type = sniff_content_type(data[:16])
+        if content_type not in self.allowed_types:
+            raise BlobError(f"Unsupported image format; expected {', '.join(self.allowed_types)}")
+        dimensions = image_dimensions(data)
+        if dimensions is None:
+            raise BlobError("Could not read image dimensions")
+        width, height = dimensions
+        if max(width, height) > self.max_dimension:
+            raise BlobError(f"Image is {width}x{height}; the longest side may be at most {self.max_dimension}px")
+        if min(width, height) < self.min_dimension:
+            raise BlobError(f"Image is {width}x{height}; the shortest side must be at least {self.min_dimension}px")
+
+    def check_gallery(self, sizes: Iterable[int]) -> None:
+        sizes = list(sizes)
+        if len(sizes) > self.max_images:
+            raise BlobError(f"A property can have at most {self.max_images} images")
+        if sum(sizes) > self.max_property_bytes:
+            raise ImageTooLarge(f"Images exceed the {self.max_property_bytes // (1024 * 1024)} MB per-property budget")
+
+
+def create_image_policy() -> ImagePolicy:
+    return ImagePolicy(
+        max_image_bytes=int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024))),
+        max_property_bytes=int(os.getenv("PROPERTY_IMAGES_MAX_BYTES", str(40 * 1024 * 1024))),
+        max_images=int(os.getenv("PROPERTY_MAX_IMAGES", "30")),
+        max_dimension=int(os.getenv("IMAGE_MAX_DIMENSION", "8000")),
+        min_dimension=int(os.getenv("IMAGE_MIN_DIMENSION", "64")),
+        allowed_types=os.getenv("IMAGE_ALLOWED_TYPES", "image/jpeg,image/png,image/webp").split(","),
+    )
+
+
+class RequestBodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """Reject JSON write requests whose body exceeds the image budget.
+
+    A declared Content-Length over the limit is refused before FastAPI reads
+    anything. Bodies without one (chunked uploads) are counted as they are
+    received, and reading stops with a 413 as soon as the count passes the
+    limit. Streaming endpoints (bulk import) are exempt and validate row by
+    row instead.
+    """
+
+    def __init__(self, app, max_bytes: int, exempt_paths: Iterable[str] = ()):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH") \
+                or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            await self.reject(scope, receive, send)
+            return
+
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    too_large = True
+                    raise RequestBodyTooLarge()
+            return message
+
+        async def guarded_send(message) -> None:
+            nonlocal response_started
+            # Whatever the app makes of the aborted read (FastAPI turns it
+            # into a 400) is replaced by the 413 below
+            if too_large and not response_started:
+                return
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except RequestBodyTooLarge:
+            pass
+        if too_large and not response_started:
+            await self.reject(scope, receive, send)
+
+    async def reject(self, scope, receive, send) -> None:
+        response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+        await response(scope, receive, send)
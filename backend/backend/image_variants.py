@@ -0,0 +1,134 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Set
+
+from blob_store import BlobStore, is_blob_key
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it originals are served as-is
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> (longest edge in px, encoder quality). Images are only ever
+# scaled down, so small originals keep their size. Detail views serve the
+# original, so there is no full-size variant.
+VARIANTS: Dict[str, tuple] = {
+    "thumb": (320, 70),
+    "card": (800, 78),
+}
+# Listing cards and cover images span most of a phone's width; "thumb" is
+# only sharp enough for the small tiles in the admin list
+LIST_VARIANT = "card"
+TILE_VARIANT = "thumb"
+VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "JPEG").upper()
+
+
+def render_variant(data: bytes, max_edge: int, quality: int) -> bytes:
+    """Resize and re-encode ``data``; returns the original if that is already smaller and in bounds."""
+    with Image.open(io.BytesIO(data)) as source:
+        fits = max(source.size) <= max_edge
+        img = ImageOps.exif_transpose(source)
+        if VARIANT_FORMAT == "JPEG" and img.mode not in ("RGB", "L"):
+            # JPEG has no alpha channel; flatten transparent areas onto white
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, VARIANT_FORMAT, quality=quality, optimize=True)
+    rendered = out.getvalue()
+    return data if fits and len(data) <= len(rendered) else rendered
+
+
+class VariantWorker:
+    """Renders image variants on a bounded thread pool off the request path.
+
+    Pillow releases the GIL while decoding, resizing and encoding, so threads
+    give real parallelism here. Keys already queued are not queued twice and
+    anything past ``max_pending`` is skipped; the image endpoint re-queues a
+    key the next time one of its missing variants is requested.
+    """
+
+    def __init__(self, store: BlobStore, max_workers: int = 2, max_pending: int = 256):
+        self.store = store
+        self.enabled = Image is not None
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="variants")
+        self._lock = threading.Lock()
+        self._queued: Set[str] = set()
+        self._generated = 0
+        self._failed = 0
+        self._skipped = 0
+
+    def schedule(self, keys: Iterable[str]) -> None:
+        if not self.enabled:
+            return
+        for key in keys:
+            if not is_blob_key(key):
+                continue
+            with self._lock:
+                if key in self._queued:
+                    continue
+                if len(self._queued) >= self.max_pending:
+                    self._skipped += 1
+                    continue
+                self._queued.add(key)
+            self._executor.submit(self._run, key)
+
+    def _run(self, key: str) -> None:
+        try:
+            self.generate(key)
+        finally:
+            with self._lock:
+                self._queued.discard(key)
+
+    def generate(self, key: str) -> int:
+        """Render whichever variants of ``key`` are missing; returns how many were written."""
+        missing = [name for name in VARIANTS if not self.store.exists(key, name)]
+        if not missing or not self.enabled:
+            return 0
+        data = b"".join(self.store.iter_chunks(key))
+        for name in missing:
+            max_edge, quality = VARIANTS[name]
+            try:
+                rendered = render_variant(data, max_edge, quality)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                # Undecodable images never will be; store the original as the
+                # variant so the image is not re-queued on every request
+                logger.warning("Cannot render %s variant of image %s: %s", name, key, e)
+                with self._lock:
+                    self._failed += 1
+                rendered = data
+            self.store.put_variant(key, name, rendered)
+        # generate() runs on several pool threads at once
+        with self._lock:
+            self._generated += len(missing)
+        return len(missing)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_workers": self.max_workers,
+                "queued": len(self._queued),
+                "generated": self._generated,
+                "failed": self._failed,
+                "skipped": self._skipped,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def create_variant_worker(store: BlobStore) -> VariantWorker:
+    return VariantWorker(
+        store,
+        max_workers=int(os.getenv("IMAGE_VARIANT_WORKERS", "2")),
+        max_pending=int(os.getenv("IMAGE_VARIANT_MAX_PENDING", "256")),
+    )
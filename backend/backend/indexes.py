@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from pagination import PAGE_SORT
+
+logger = logging.getLogger(__name__)
+
+# Indexes are declared per collection and named so they can be matched
+# against explain output. Keys follow equality -> sort -> range ordering
+# for the query shapes issued by the API.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "properties": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="created_at_id"),
+        # Serves status-only filters through its prefix too. Price sits
+        # after the sort keys (ESR), so price-range pages walk the index in
+        # order and drop out-of-range entries without fetching them
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING),
+                    ("price_usd", ASCENDING)],
+                   name="status_created_at_id_price"),
+        IndexModel([("area", ASCENDING), ("status", ASCENDING),
+                    ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="area_status_created_at_id"),
+        IndexModel([("property_type", ASCENDING), ("status", ASCENDING),
+                    ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="type_status_created_at_id"),
+        IndexModel([("location", GEOSPHERE), ("status", ASCENDING)],
+                   name="location_2dsphere_status"),
+        IndexModel([("title", TEXT), ("location_detail", TEXT), ("description", TEXT)],
+                   weights={"title": 10, "location_detail": 5, "description": 1},
+                   name="text_search"),
+        # Admin list sorted by lead counters
+        IndexModel([("lead_counts.total", DESCENDING), ("_id", DESCENDING)],
+                   name="lead_counts_total_id"),
+        IndexModel([("lead_counts.by_status.pending", DESCENDING), ("_id", DESCENDING)],
+                   name="lead_counts_pending_id"),
+    ],
+    "leads": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="created_at_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="status_created_at_id"),
+        IndexModel([("property_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="property_id_created_at_id"),
+        # Prefix search on the admin leads screen
+        IndexModel([("name_lower", ASCENDING)], name="name_lower"),
+        IndexModel([("phone", ASCENDING)], name="phone"),
+    ],
+    "admins": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+}
+
+# Indexes replaced by the ones above; dropped on startup so they stop
+# costing writes
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    "properties": ["status_price", "status_created_at_id"],
+}
+
+# Representative query shapes issued by the API, used for the explain report
+QUERY_SHAPES = [
+    {"name": "get_properties (default)", "collection": "properties",
+     "filter": {"status": "active"}, "sort": PAGE_SORT},
+    {"name": "get_properties (area)", "collection": "properties",
+     "filter": {"area": "Beirut", "status": "active"}, "sort": PAGE_SORT},
+    {"name": "get_properties (property_type)", "collection": "properties",
+     "filter": {"property_type": "Apartment", "status": "active"}, "sort": PAGE_SORT},
+    {"name": "get_properties (price range)", "collection": "properties",
+     "filter": {"status": "active", "price_usd": {"$gte": 100000, "$lte": 500000}},
+     "sort": PAGE_SORT},
+    {"name": "get_properties (all statuses)", "collection": "properties",
+     "filter": {}, "sort": PAGE_SORT},
+    {"name": "get_properties_within", "collection": "properties",
+     "filter": {"status": "active", "location": {"$geoWithin": {"$geometry": {
+         "type": "Polygon",
+         "coordinates": [[[35.4, 33.8], [35.7, 33.8], [35.7, 34.0], [35.4, 34.0], [35.4, 33.8]]],
+     }}}}, "sort": None},
+    {"name": "get_admin_properties (leads)", "collection": "properties",
+     "filter": {}, "sort": [("lead_counts.total", -1), ("_id", -1)]},
+    {"name": "get_admin_properties (pending)", "collection": "properties",
+     "filter": {}, "sort": [("lead_counts.by_status.pending", -1), ("_id", -1)]},
+    {"name": "get_leads (default)", "collection": "leads",
+     "filter": {}, "sort": PAGE_SORT},
+    {"name": "get_leads (status)", "collection": "leads",
+     "filter": {"status": "pending"}, "sort": PAGE_SORT},
+    {"name": "get_leads (property_id)", "collection": "leads",
+     "filter": {"property_id": "000000000000000000000000"}, "sort": PAGE_SORT},
+    {"name": "get_leads (date range)", "collection": "leads",
+     "filter": {"created_at": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)}},
+     "sort": PAGE_SORT},
+    {"name": "get_leads (name/phone prefix)", "collection": "leads",
+     "filter": {"$or": [{"name_lower": {"$regex": "^jo"}}, {"phone": {"$regex": "^\\+961"}}]},
+     "sort": PAGE_SORT},
+    {"name": "get_current_admin", "collection": "admins",
+     "filter": {"email": "admin@example.com"}, "sort": None},
+]
+
+
+async def ensure_indexes(db) -> None:
+    """Create any missing registry indexes and drop retired ones. Safe to run on every startup."""
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        for model in models:
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+                logger.info("Index ensured: %s.%s", collection_name, name)
+            except OperationFailure as e:
+                logger.error("Could not create index %s.%s: %s", collection_name, name, e)
+    for collection_name, names in RETIRED_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name in names:
+            if name not in existing:
+                continue
+            try:
+                await db[collection_name].drop_index(name)
+                logger.info("Index dropped: %s.%s", collection_name, name)
+            except OperationFailure as e:
+                logger.error("Could not drop index %s.%s: %s", collection_name, name, e)
+
+
+def _plan_stages(plan: dict) -> List[dict]:
+    stages = [plan]
+    for key in ("inputStage", "inputStages", "queryPlan"):
+        child = plan.get(key)
+        if isinstance(child, dict):
+            stages.extend(_plan_stages(child))
+        elif isinstance(child, list):
+            for item in child:
+                stages.extend(_plan_stages(item))
+    return stages
+
+
+def summarize_explain(explain: dict) -> Dict[str, Optional[object]]:
+    winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    stages = _plan_stages(winning_plan)
+    index_names = [s["indexName"] for s in stages if s.get("indexName")]
+    stats = explain.get("executionStats", {})
+    return {
+        "index": ", ".join(index_names) if index_names else None,
+        "collection_scan": any(s.get("stage") == "COLLSCAN" for s in stages),
+        "in_memory_sort": any(s.get("stage") == "SORT" for s in stages),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+async def explain_report(db, limit: int = 20) -> List[dict]:
+    """Explain each known query shape and report which index it uses."""
+    report = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape["collection"]].find(shape["filter"])
+        if shape["sort"]:
+            cursor = cursor.sort(shape["sort"])
+        explain = await cursor.limit(limit).explain()
+        report.append({
+            "query": shape["name"],
+            "collection": shape["collection"],
+            **summarize_explain(explain),
+        })
+    return report
@@ -0,0 +1,97 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+LEAD_STATUSES = ("pending", "contacted", "completed")
+
+# Admin list sort options -> property field, all paged newest/highest first
+PROPERTY_LEAD_SORTS = {
+    "created": "created_at",
+    "leads": "lead_counts.total",
+    "pending_leads": "lead_counts.by_status.pending",
+}
+
+
+def empty_lead_counts() -> Dict:
+    return {"total": 0, "by_status": {status: 0 for status in LEAD_STATUSES}}
+
+
+def lead_counts_to_dict(counts: Optional[dict]) -> dict:
+    counts = counts or {}
+    by_status = {status: 0 for status in LEAD_STATUSES}
+    by_status.update(counts.get("by_status") or {})
+    return {"total": counts.get("total", 0), "by_status": by_status}
+
+
+async def record_new_lead(properties, property_id: str, status: str = "pending", delta: int = 1) -> bool:
+    """Bump the property's counters; returns False when the property does not exist."""
+    result = await properties.update_one(
+        {"_id": ObjectId(property_id)},
+        {"$inc": {"lead_counts.total": delta, f"lead_counts.by_status.{status}": delta}},
+    )
+    return result.matched_count > 0
+
+
+async def record_stored_leads(properties, property_ids: Iterable[str], status: str = "pending") -> None:
+    """Bump counters for leads that are already stored, one update per property."""
+    counts = Counter(property_ids)
+    if not counts:
+        return
+    await properties.bulk_write([
+        UpdateOne({"_id": ObjectId(property_id)},
+                  {"$inc": {"lead_counts.total": count, f"lead_counts.by_status.{status}": count}})
+        for property_id, count in counts.items()
+    ], ordered=False)
+
+
+async def record_status_change(properties, property_id: str, old_status: str, new_status: str) -> None:
+    if old_status == new_status or not ObjectId.is_valid(property_id):
+        return
+    await properties.update_one(
+        {"_id": ObjectId(property_id)},
+        {"$inc": {
+            f"lead_counts.by_status.{old_status}": -1,
+            f"lead_counts.by_status.{new_status}": 1,
+        }},
+    )
+
+
+# Recount every property's leads in one pass and write the result back with
+# $merge. Properties without leads get zeroed counters, which also backfills
+# documents created before the counters existed.
+RECONCILE_PIPELINE: List[dict] = [
+    {"$project": {"_id": 1}},
+    {"$lookup": {
+        "from": "leads",
+        "let": {"property_id": {"$toString": "$_id"}},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$property_id", "$$property_id"]}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ],
+        "as": "statuses",
+    }},
+    {"$project": {
+        "lead_counts": {
+            "total": {"$sum": "$statuses.count"},
+            "by_status": {"$mergeObjects": [
+                {status: 0 for status in LEAD_STATUSES},
+                {"$arrayToObject": {"$map": {
+                    "input": {"$filter": {
+                        "input": "$statuses",
+                        "cond": {"$eq": [{"$type": "$$this._id"}, "string"]},
+                    }},
+                    "in": {"k": "$$this._id", "v": "$$this.count"},
+                }}},
+            ]},
+        },
+    }},
+    {"$merge": {"into": "properties", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+]
+
+
+async def reconcile_lead_counts(db) -> int:
+    """Recompute lead counters for every property; returns the number reconciled."""
+    await db.properties.aggregate(RECONCILE_PIPELINE).to_list(None)
+    return await db.properties.count_documents({})
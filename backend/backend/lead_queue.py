@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# "ack": callers wait until the batch holding their lead is written, so a
+# successful response means the lead is stored (group commit).
+# "buffered": callers return once the lead is queued; anything still queued
+# is lost if the process dies before the next flush.
+DURABILITY_MODES = ("ack", "buffered")
+
+
+class LeadQueue:
+    """Batches lead inserts into insert_many calls on a fixed flush interval.
+
+    When disabled (or not started) every submit is a plain insert_one. A full
+    queue also falls back to insert_one rather than rejecting the lead.
+
+    In buffered mode the caller has returned before the insert happens, so
+    ``on_inserted`` is awaited with the documents actually stored; anything
+    derived from the leads (e.g. per-property counters) is updated there.
+    """
+
+    def __init__(self, collection, enabled: bool = False, flush_interval: float = 0.05,
+                 max_batch: int = 100, max_pending: int = 10000, durability: str = "ack",
+                 on_written: Optional[Callable[[int], None]] = None,
+                 on_inserted: Optional[Callable[[List[dict]], Awaitable[None]]] = None):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}")
+        self.collection = collection
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.durability = durability
+        self.on_written = on_written
+        self.on_inserted = on_inserted
+        self._pending: List[Tuple[dict, Optional[asyncio.Future]]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._batches = 0
+        self._queued = 0
+        self._written = 0
+        self._failed = 0
+        self._direct = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    @property
+    def buffered(self) -> bool:
+        return self.durability == "buffered"
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still queued.
+
+        The loop is not cancelled: a batch already handed to insert_many is
+        awaited so its callers get a result. New submits go straight to
+        insert_one from here on.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+            try:
+                await self.flush()
+            finally:
+                self._fail_pending(RuntimeError("Lead queue stopped before the lead was written"))
+
+    async def submit(self, doc: dict) -> None:
+        """Store ``doc``; it must already carry its ``_id``."""
+        if not self.running or len(self._pending) >= self.max_pending:
+            self._direct += 1
+            await self.collection.insert_one(doc)
+            await self._after_insert([doc])
+            return
+        future = None if self.buffered else asyncio.get_running_loop().create_future()
+        self._pending.append((doc, future))
+        self._queued += 1
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        if future is not None:
+            await future
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _fail_pending(self, error: Exception) -> None:
+        batch, self._pending = self._pending, []
+        self._resolve(batch, {index: error for index in range(len(batch))})
+
+    async def flush(self) -> None:
+        while self._pending:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[dict, Optional[asyncio.Future]]]) -> None:
+        errors: Dict[int, Exception] = {}
+        try:
+            await self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                errors[write_error["index"]] = PyMongoError(write_error.get("errmsg", "Insert failed"))
+        except PyMongoError as e:
+            errors = {index: e for index in range(len(batch))}
+        except BaseException:
+            # Cancelled or crashed mid-insert: never leave a caller waiting
+            error = RuntimeError("Lead batch insert was interrupted")
+            self._resolve(batch, {index: error for index in range(len(batch))})
+            raise
+
+        self._batches += 1
+        self._failed += len(errors)
+        self._written += len(batch) - len(errors)
+        self._resolve(batch, errors)
+        await self._after_insert([doc for index, (doc, _) in enumerate(batch) if index not in errors])
+
+    async def _after_insert(self, docs: List[dict]) -> None:
+        if not docs:
+            return
+        if self.buffered and self.on_inserted:
+            try:
+                await self.on_inserted(docs)
+            except PyMongoError as e:
+                logger.error("Post-insert update failed for %d stored leads: %s", len(docs), e)
+        if self.on_written:
+            self.on_written(len(docs))
+
+    def _resolve(self, batch: List[Tuple[dict, Optional[asyncio.Future]]], errors: Dict[int, Exception]) -> None:
+        for index, (doc, future) in enumerate(batch):
+            error = errors.get(index)
+            if future is None:
+                if error is not None:
+                    logger.error("Dropped buffered lead %s: %s", doc.get("_id"), error)
+            elif not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(None)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "durability": self.durability,
+            "flush_interval": self.flush_interval,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "queued": self._queued,
+            "batches": self._batches,
+            "written": self._written,
+            "failed": self._failed,
+            "direct_inserts": self._direct,
+        }
+
+
+def create_lead_queue(collection, on_written: Optional[Callable[[int], None]] = None,
+                      on_inserted: Optional[Callable[[List[dict]], Awaitable[None]]] = None) -> LeadQueue:
+    return LeadQueue(
+        collection,
+        enabled=os.getenv("LEAD_QUEUE_ENABLED", "false").lower() == "true",
+        flush_interval=int(os.getenv("LEAD_QUEUE_FLUSH_INTERVAL_MS", "50")) / 1000,
+        max_batch=int(os.getenv("LEAD_QUEUE_MAX_BATCH", "100")),
+        max_pending=int(os.getenv("LEAD_QUEUE_MAX_PENDING", "10000")),
+        durability=os.getenv("LEAD_QUEUE_DURABILITY", "ack"),
+        on_written=on_written,
+        on_inserted=on_inserted,
+    )
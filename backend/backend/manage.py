@@ -0,0 +1,142 @@
+"""Operational commands for the Aimlink Properties backend.
+
+Run from this directory, e.g. ``python manage.py migrate-images``.
+"""
+import asyncio
+
+import typer
+
+from blob_store import BlobError, is_blob_key, store_image
+from geo import geo_point
+from indexes import ensure_indexes, explain_report
+from lead_counters import reconcile_lead_counts
+from server import client, db, image_store, variant_worker
+
+cli = typer.Typer(help="Aimlink Properties maintenance commands")
+
+
+async def _migrate_images(batch_size: int, dry_run: bool):
+    scanned = migrated = failed = 0
+    # Only documents that still carry inline base64 need rewriting
+    query = {"images": {"$elemMatch": {"$not": {"$regex": "^[0-9a-f]{64}$"}}}}
+    cursor = db.properties.find(query, {"images": 1}).batch_size(batch_size)
+    async for prop in cursor:
+        scanned += 1
+        try:
+            keys = [
+                image if is_blob_key(image) else store_image(image_store, image)
+                for image in prop.get("images", [])
+            ]
+        except BlobError as e:
+            failed += 1
+            typer.echo(f"  ✗ {prop['_id']}: {e}")
+            continue
+        if not dry_run:
+            await db.properties.update_one({"_id": prop["_id"]}, {"$set": {"images": keys}})
+        migrated += 1
+    return scanned, migrated, failed
+
+
+@cli.command("migrate-images")
+def migrate_images(
+    batch_size: int = typer.Option(50, help="Documents fetched per cursor batch"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Store blobs but leave documents untouched"),
+):
+    """Move inline base64 property images into the blob store."""
+    scanned, migrated, failed = asyncio.run(_migrate_images(batch_size, dry_run))
+    typer.echo(f"Scanned {scanned} properties, migrated {migrated}, failed {failed}")
+    client.close()
+
+
+async def _generate_variants(batch_size: int):
+    scanned = generated = 0
+    cursor = db.properties.find({}, {"images": 1}).batch_size(batch_size)
+    async for prop in cursor:
+        for image in prop.get("images", []):
+            if not is_blob_key(image):
+                continue
+            scanned += 1
+            generated += variant_worker.generate(image)
+    return scanned, generated
+
+
+@cli.command("generate-variants")
+def generate_variants(
+    batch_size: int = typer.Option(50, help="Documents fetched per cursor batch"),
+):
+    """Render missing thumb and card variants for every stored property image."""
+    if not variant_worker.enabled:
+        typer.echo("Pillow is not installed; install it to render image variants")
+        raise typer.Exit(1)
+    scanned, generated = asyncio.run(_generate_variants(batch_size))
+    typer.echo(f"Checked {scanned} images, rendered {generated} variants")
+    client.close()
+
+
+async def _backfill_locations():
+    updated = 0
+    query = {"latitude": {"$type": "number"}, "longitude": {"$type": "number"}, "location": {"$exists": False}}
+    async for prop in db.properties.find(query, {"latitude": 1, "longitude": 1}):
+        location = geo_point(prop["latitude"], prop["longitude"])
+        await db.properties.update_one({"_id": prop["_id"]}, {"$set": {"location": location}})
+        updated += 1
+    return updated
+
+
+@cli.command("backfill-locations")
+def backfill_locations():
+    """Add GeoJSON location points to properties that only have latitude/longitude."""
+    updated = asyncio.run(_backfill_locations())
+    typer.echo(f"Added location to {updated} properties")
+    client.close()
+
+
+async def _backfill_lead_search():
+    updated = 0
+    async for lead in db.leads.find({"name_lower": {"$exists": False}}, {"name": 1}):
+        await db.leads.update_one(
+            {"_id": lead["_id"]}, {"$set": {"name_lower": lead.get("name", "").strip().lower()}}
+        )
+        updated += 1
+    return updated
+
+
+@cli.command("backfill-lead-search")
+def backfill_lead_search():
+    """Add the lowercased name used by the admin lead search to older leads."""
+    updated = asyncio.run(_backfill_lead_search())
+    typer.echo(f"Added name_lower to {updated} leads")
+    client.close()
+
+
+@cli.command("reconcile-lead-counts")
+def reconcile_lead_counts_command():
+    """Recompute every property's lead counters from the leads collection."""
+    reconciled = asyncio.run(reconcile_lead_counts(db))
+    typer.echo(f"Reconciled lead counts for {reconciled} properties")
+    client.close()
+
+
+@cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Create any missing indexes from the index registry."""
+    asyncio.run(ensure_indexes(db))
+    client.close()
+
+
+@cli.command("index-report")
+def index_report():
+    """Explain the API's query shapes and show which index each one uses."""
+    report = asyncio.run(explain_report(db))
+    for row in report:
+        plan = row["index"] or ("COLLSCAN" if row["collection_scan"] else "-")
+        sort = " +SORT" if row["in_memory_sort"] else ""
+        typer.echo(
+            f"{row['query']:<34} {plan}{sort}  "
+            f"docs={row['docs_examined']} keys={row['keys_examined']} returned={row['returned']}"
+        )
+    client.close()
+
+
+if __name__ == "__main__":
+    cli()
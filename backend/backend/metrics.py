@@ -0,0 +1,250 @@
+import bisect
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Label used for requests that matched no route, so probes for random paths
+# cannot grow the series count without bound
+UNMATCHED_ROUTE = "unmatched"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values.
+
+    Observations come from the event loop and from pymongo's monitoring
+    threads, so updates take a lock; each is a bisect and a few additions.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for label_values, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_number(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> bytes:
+        """Prometheus text exposition of every metric, plus point-in-time ``gauges`` (name -> (help, value))."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for name, (help, value) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_number(value)}")
+        return ("\n".join(lines) + "\n").encode()
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte", ("method", "route")
+)
+http_request_size = registry.histogram(
+    "http_request_size_bytes", "Request body size", ("method", "route"), SIZE_BUCKETS
+)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size as sent, after compression", ("method", "route"), SIZE_BUCKETS
+)
+mongo_latency = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trip as reported by the driver",
+    ("collection", "command"), MONGO_BUCKETS
+)
+mongo_failures = registry.counter(
+    "mongo_command_failures_total", "MongoDB commands that returned an error", ("collection", "command")
+)
+
+
+def route_label(scope: Scope) -> str:
+    # FastAPI puts the matched route in the scope; its path is the template
+    # ("/api/properties/{property_id}"), not the concrete URL
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Records latency, status and payload sizes for every HTTP request.
+
+    Registered outermost so latency covers the other middleware and the
+    response size is what actually went over the wire.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def counting_receive() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            method = scope["method"]
+            route = route_label(scope)
+            if not request_bytes:
+                # Bodies rejected before being read still declare their size
+                length = Headers(scope=scope).get("content-length", "")
+                request_bytes = int(length) if length.isdigit() else 0
+            http_requests.inc(method, route, str(status))
+            http_latency.observe(time.perf_counter() - started, method, route)
+            http_request_size.observe(request_bytes, method, route)
+            http_response_size.observe(response_bytes, method, route)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener feeding the Mongo histograms.
+
+    Motor runs pymongo underneath, so passing this to the client via
+    ``event_listeners`` times every operation the app issues.
+    """
+
+    # Commands whose first value is not the collection name
+    COLLECTION_KEYS = {"getMore": "collection"}
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, object], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, event: monitoring.CommandStartedEvent) -> str:
+        key = self.COLLECTION_KEYS.get(event.command_name, event.command_name)
+        value = event.command.get(key)
+        return value if isinstance(value, str) else "-"
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        with self._lock:
+            self._inflight[(event.request_id, event.connection_id)] = (self._collection(event), event.command_name)
+
+    def _finish(self, event, failed: bool) -> None:
+        with self._lock:
+            labels = self._inflight.pop((event.request_id, event.connection_id), None)
+        if labels is None:
+            labels = ("-", event.command_name)
+        mongo_latency.observe(event.duration_micros / 1e6, *labels)
+        if failed:
+            mongo_failures.inc(*labels)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
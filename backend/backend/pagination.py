@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "20"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+# Newest first; _id breaks ties between documents sharing a created_at
+PAGE_SORT = [("created_at", -1), ("_id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def page_sort(sort_field: str = "created_at") -> List[Tuple[str, int]]:
+    return PAGE_SORT if sort_field == "created_at" else [(sort_field, -1), ("_id", -1)]
+
+
+def _field_value(doc: dict, path: str):
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def encode_cursor(doc: dict, sort_field: str = "created_at") -> str:
+    value = _field_value(doc, sort_field)
+    # Datetimes go under "c"; numeric sort keys (e.g. counters) under "v",
+    # with null standing for a missing field
+    key = {"c": value.isoformat()} if isinstance(value, datetime) else {"v": value}
+    payload = json.dumps({**key, "i": str(doc["_id"])})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, int, float, None], ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if "c" in payload:
+            value = datetime.fromisoformat(payload["c"])
+        elif payload["v"] is None or (
+            isinstance(payload["v"], (int, float)) and not isinstance(payload["v"], bool)
+        ):
+            value = payload["v"]
+        else:
+            raise ValueError("Cursor value must be a number or null")
+        return value, ObjectId(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursor("Invalid cursor")
+
+
+def apply_cursor(query: dict, cursor: Optional[str], sort_field: str = "created_at") -> dict:
+    """Restrict ``query`` to documents strictly after ``cursor`` in page_sort() order."""
+    if not cursor:
+        return query
+    value, last_id = decode_cursor(cursor)
+    if value is None:
+        # Null and missing sort last when descending, and {field: None}
+        # matches both, so only ties on _id remain
+        after = {sort_field: None, "_id": {"$lt": last_id}}
+    else:
+        # $lt never matches null or missing; those documents still follow
+        after = {"$or": [
+            {sort_field: {"$lt": value}},
+            {sort_field: value, "_id": {"$lt": last_id}},
+            {sort_field: None},
+        ]}
+    return {"$and": [query, after]} if query else after
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+async def fetch_page(collection, query: dict, cursor: Optional[str], limit: Optional[int],
+                     projection: Optional[dict] = None,
+                     sort_field: str = "created_at") -> Tuple[List[dict], Optional[str]]:
+    """Fetch one keyset page, returning the documents and the cursor for the next page.
+
+    Pages are ordered by ``sort_field`` descending with ``_id`` as tie-breaker;
+    documents missing the field come last, as Mongo sorts them.
+    """
+    page_size = clamp_page_size(limit)
+    # Over-fetch by one to learn whether another page exists without a count
+    docs = await collection.find(apply_cursor(query, cursor, sort_field), projection) \
+        .sort(page_sort(sort_field)).limit(page_size + 1).to_list(page_size + 1)
+    next_cursor = encode_cursor(docs[page_size - 1], sort_field) if len(docs) > page_size else None
+    return docs[:page_size], next_cursor
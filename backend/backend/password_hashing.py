@@ -0,0 +1,96 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional
+
+from passlib.context import CryptContext
+
+
+class HashingOverloaded(RuntimeError):
+    pass
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class PasswordHasher:
+    """Runs bcrypt work on a bounded thread pool instead of the event loop.
+
+    ``max_workers`` caps concurrent bcrypt operations; ``max_pending`` caps
+    how many callers may wait for a worker before new ones are rejected.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = 2, max_pending: int = 64,
+                 sample_size: int = 1000):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_times: Deque[float] = deque(maxlen=sample_size)
+        self._run_times: Deque[float] = deque(maxlen=sample_size)
+
+    async def _run(self, fn: Callable, *args):
+        if self._pending >= self.max_workers + self.max_pending:
+            self._rejected += 1
+            raise HashingOverloaded("Too many password operations in flight")
+        self._pending += 1
+        submitted = time.perf_counter()
+        timings = {}
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings["queue"] = started - submitted
+                timings["run"] = time.perf_counter() - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+            if timings:
+                self._completed += 1
+                self._queue_times.append(timings["queue"])
+                self._run_times.append(timings["run"])
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    def stats(self) -> Dict[str, object]:
+        queue_times = list(self._queue_times)
+        run_times = list(self._run_times)
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "queue_time_p50": _percentile(queue_times, 0.50),
+            "queue_time_p99": _percentile(queue_times, 0.99),
+            "queue_time_max": max(queue_times) if queue_times else None,
+            "run_time_p50": _percentile(run_times, 0.50),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def create_password_hasher(context: CryptContext) -> PasswordHasher:
+    return PasswordHasher(
+        context,
+        max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+        max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64")),
+    )
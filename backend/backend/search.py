@@ -0,0 +1,105 @@
+import os
+from typing import Dict, List, Optional
+
+from pagination import apply_cursor, encode_cursor, page_sort
+
+PRICE_BUCKETS = [
+    int(b) for b in os.getenv(
+        "SEARCH_PRICE_BUCKETS", "0,100000,250000,500000,1000000,2000000"
+    ).split(",")
+]
+
+
+def _count_facet(field: str) -> List[dict]:
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+
+
+def search_sort_field(q: Optional[str]) -> str:
+    # Ranked by relevance when there is a query, newest first otherwise;
+    # _id breaks ties either way so pages never overlap
+    return "score" if q else "created_at"
+
+
+def search_pipeline(q: Optional[str], match: dict, limit: int, projection: dict,
+                    cursor: Optional[str] = None) -> List[dict]:
+    """One aggregation returning ranked hits plus facet counts over all matches.
+
+    ``cursor`` only narrows the hits, so every page reports the same total
+    and facets. Raises InvalidCursor for a malformed cursor.
+    """
+    pipeline: List[dict] = []
+    if q:
+        # $text must be in the first $match stage of the pipeline
+        pipeline.append({"$match": {"$text": {"$search": q}, **match}})
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+    else:
+        pipeline.append({"$match": match})
+    sort_field = search_sort_field(q)
+
+    hits: List[dict] = []
+    if cursor:
+        hits.append({"$match": apply_cursor({}, cursor, sort_field)})
+    hits.extend([
+        {"$sort": dict(page_sort(sort_field))},
+        {"$limit": limit},
+        {"$project": {**projection, "score": 1}},
+    ])
+    pipeline.append({"$facet": {
+        "hits": hits,
+        "total": [{"$count": "count"}],
+        "area": _count_facet("area"),
+        "property_type": _count_facet("property_type"),
+        "bedrooms": _count_facet("bedrooms"),
+        "price": price_facet(),
+    }})
+    return pipeline
+
+
+def price_facet() -> List[dict]:
+    return [{"$bucket": {
+        # Prices below the lowest boundary count towards the first bucket;
+        # "default" only ever holds prices at or above the highest one
+        "groupBy": {"$max": [PRICE_BUCKETS[0], "$price_usd"]},
+        "boundaries": PRICE_BUCKETS,
+        "default": "above",
+        "output": {"count": {"$sum": 1}},
+    }}]
+
+
+def _price_buckets(groups: List[dict]) -> List[Dict[str, Optional[float]]]:
+    buckets = []
+    for group in groups:
+        if group["_id"] == "above":
+            buckets.append({"min": PRICE_BUCKETS[-1], "max": None, "count": group["count"]})
+        else:
+            index = PRICE_BUCKETS.index(group["_id"])
+            buckets.append({"min": group["_id"], "max": PRICE_BUCKETS[index + 1], "count": group["count"]})
+    return buckets
+
+
+async def run_search(collection, q: Optional[str], match: dict, limit: int, projection: dict,
+                     cursor: Optional[str] = None) -> dict:
+    # Over-fetch by one to learn whether another page exists
+    pipeline = search_pipeline(q, match, limit + 1, projection, cursor)
+    result = await collection.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {}
+    total = facets.get("total") or [{"count": 0}]
+    hits = facets.get("hits", [])
+    return {
+        "hits": hits[:limit],
+        "next_cursor": encode_cursor(hits[limit - 1], search_sort_field(q)) if len(hits) > limit else None,
+        "total": total[0]["count"],
+        "facets": {
+            "area": {str(g["_id"]): g["count"] for g in facets.get("area", []) if g["_id"] is not None},
+            "property_type": {
+                str(g["_id"]): g["count"] for g in facets.get("property_type", []) if g["_id"] is not None
+            },
+            "bedrooms": {
+                str(g["_id"]): g["count"] for g in facets.get("bedrooms", []) if g["_id"] is not None
+            },
+            "price": _price_buckets(facets.get("price", [])),
+        },
+    }
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from bson import ObjectId
+from starlette.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode API payloads; datetimes and ObjectIds are handled natively."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson. Pre-encoded bytes are sent as-is."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A response body encoded once, plus its validators, ready to cache."""
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    # Compressed variants keyed by content-coding, filled on first request
+    compressed: Dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
@@ -1,42 +1,150 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import re
+import json
+import time
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
+from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 import jwt
 from bson import ObjectId
 
+from blob_store import (
+    BlobError, blob_key_from_ref, create_blob_store, image_url, is_blob_key, resolve_image, sniff_content_type
+)
+from bulk import (
+    BULK_BATCH_SIZE, BULK_FORMATS, BULK_MAX_ERRORS, BulkFormatError, export_rows, parse_rows, resolve_format
+)
+from cache import TTLCache
+from clustering import (
+    CLUSTER_CACHE_MAX_ZOOM, build_clusters, clusters_for_tiles, clusters_in_bbox, fit_zoom, tiles_in_bbox
+)
+from compression import COMPRESSION_MIN_SIZE, CompressionMiddleware, choose_encoding, precompressed, weaken_etag
+from conditional import is_not_modified, make_etag, validator_headers
+from dashboard import compute_dashboard_stats
+from diagnostics import ProfilingMiddleware, QueryRecorder, SlowRequestMiddleware
+from geo import InvalidGeoQuery, bbox_query, check_bbox, clamp_geo_limit, geo_point, near_query
+from password_hashing import HashingOverloaded, create_password_hasher
+from image_validation import ImageTooLarge, UploadSizeLimitMiddleware, create_image_policy
+from image_variants import LIST_VARIANT, TILE_VARIANT, VARIANTS, create_variant_worker
+from indexes import ensure_indexes, explain_report
+from lead_counters import (
+    LEAD_STATUSES, PROPERTY_LEAD_SORTS, empty_lead_counts, lead_counts_to_dict, record_new_lead,
+    record_status_change, record_stored_leads
+)
+from lead_queue import create_lead_queue
+from metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, MongoCommandTimer, registry
+from pagination import PAGE_SORT, InvalidCursor, clamp_page_size, fetch_page
+from search import run_search
+from serialization import EncodedBody, FastJSONResponse, dumps
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Command listeners: timings for /metrics, and per-request query shapes for
+# the slow-request log
+mongo_listeners = [MongoCommandTimer()] if METRICS_ENABLED else []
+client = AsyncIOMotorClient(mongo_url, event_listeners=mongo_listeners + [QueryRecorder()])
 db = client[os.environ['DB_NAME']]
 
+# Image blob storage
+image_store = create_blob_store()
+variant_worker = create_variant_worker(image_store)
+image_policy = create_image_policy()
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# A variant request answered with the original while the variant renders
+# must not be cached for long, or clients keep the full-size bytes
+VARIANT_FALLBACK_CACHE_CONTROL = "public, max-age=60"
+
+# In-process caches, invalidated from the write paths below
+dashboard_cache = TTLCache(maxsize=1, ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "30")), name="dashboard")
+admin_cache = TTLCache(
+    maxsize=int(os.getenv("ADMIN_AUTH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ADMIN_AUTH_CACHE_TTL", "300")),
+    name="admin_auth"
+)
+property_cache = TTLCache(
+    maxsize=int(os.getenv("PROPERTY_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("PROPERTY_CACHE_TTL", "300")),
+    name="property_detail"
+)
+listing_cache = TTLCache(
+    maxsize=int(os.getenv("LISTING_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("LISTING_CACHE_TTL", "60")),
+    name="property_listings"
+)
+# Whole-collection clusters per (zoom, status) up to CLUSTER_CACHE_MAX_ZOOM,
+# per (zoom, status, tile) above it; bbox requests filter these
+cluster_cache = TTLCache(
+    maxsize=int(os.getenv("CLUSTER_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("CLUSTER_CACHE_TTL", "600")),
+    name="map_clusters"
+)
+# Bumped per email to drop every cached token for that admin at once. This
+# is only this process's fast path: the authoritative revocation is the
+# token_generation on the admin document, which every token carries and
+# which is checked on each cache miss. Other workers therefore stop
+# accepting a revoked token once their cached entry expires, i.e. within
+# ADMIN_AUTH_CACHE_TTL; lower it if that window matters.
+admin_generations: Dict[str, int] = {}
+
+def invalidate_admin(email: str):
+    admin_generations[email] = admin_generations.get(email, 0) + 1
+
+def on_properties_changed(property_id: Optional[str] = None):
+    dashboard_cache.clear()
+    listing_cache.clear()
+    cluster_cache.clear()
+    if property_id:
+        property_cache.invalidate(property_id)
+
+def on_leads_changed():
+    dashboard_cache.clear()
+
+async def count_stored_leads(leads: List[dict]):
+    await record_stored_leads(db.properties, [lead["property_id"] for lead in leads])
+
+# Lead inserts, optionally batched (LEAD_QUEUE_ENABLED)
+lead_queue = create_lead_queue(
+    db.leads, on_written=lambda count: on_leads_changed(), on_inserted=count_stored_leads
+)
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # Security
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = create_password_hasher(pwd_context)
 security = HTTPBearer()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "aimlink-properties-secret-key-2025")
 ALGORITHM = "HS256"
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HashingOverloaded:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except HashingOverloaded:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -50,20 +158,87 @@ def verify_token(token: str):
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def get_page(collection, query: dict, cursor: Optional[str], limit: Optional[int],
+                   projection: Optional[dict] = None, sort_field: str = "created_at"):
+    try:
+        return await fetch_page(collection, query, cursor, limit, projection, sort_field)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def stored_image_size(image: str) -> int:
+    if is_blob_key(image):
+        return image_store.size(image) if image_store.exists(image) else 0
+    # Legacy inline base64
+    return len(image) * 3 // 4
+
+async def store_images(images: List[str], existing: List[str] = ()) -> List[str]:
+    """Validate and store one property's images, returning keys not already in ``existing``.
+
+    Everything is checked against the image policy before any blob is
+    written, so a rejected upload leaves nothing behind. Repeats of the same
+    photo, in the request or already on the property, are kept once.
+    """
+    def resolve_all() -> List[str]:
+        resolved: Dict[str, Optional[bytes]] = {}
+        for image in images:
+            key, data = resolve_image(image_store, image, image_policy)
+            resolved.setdefault(key, data)
+        new = {key: data for key, data in resolved.items() if key not in existing}
+        image_policy.check_gallery(
+            [len(data) if data is not None else stored_image_size(key) for key, data in new.items()]
+            + [stored_image_size(image) for image in existing]
+        )
+        for data in new.values():
+            if data is not None:
+                image_store.put(data)
+        return list(new)
+    
+    try:
+        keys = await run_in_threadpool(resolve_all)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except BlobError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Resized variants render in the background; until they exist the
+    # variant URLs fall back to the original
+    variant_worker.schedule(keys)
+    return keys
+
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
+    cached = admin_cache.get(token)
+    if cached is not None:
+        admin, generation = cached
+        if generation == admin_generations.get(admin["email"], 0):
+            return admin
+    
     payload = verify_token(token)
     admin_email = payload.get("email")
     if not admin_email:
         raise HTTPException(status_code=401, detail="Invalid authentication")
-    admin = await db.admins.find_one({"email": admin_email})
+    generation = admin_generations.get(admin_email, 0)
+    admin = await db.admins.find_one({"email": admin_email}, {"password": 0})
     if not admin:
         raise HTTPException(status_code=401, detail="Admin not found")
+    if payload.get("gen", 0) != admin.get("token_generation", 0):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    
+    # Never serve a cached principal past the token's own expiry
+    ttl = min(admin_cache.ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        admin_cache.set(token, (admin, generation), ttl=ttl)
     return admin
 
+async def is_admin_token(token: str) -> bool:
+    try:
+        await get_current_admin(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    except HTTPException:
+        return False
+    return True
+
 # Models
 class AdminLogin(BaseModel):
     email: EmailStr
@@ -73,6 +248,10 @@ class AdminResponse(BaseModel):
     email: str
     token: str
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
 class PropertyCreate(BaseModel):
     title: str
     area: str  # Beirut or Mount Lebanon
@@ -85,9 +264,9 @@ class PropertyCreate(BaseModel):
     floor_level: Optional[str] = None
     view_type: Optional[str] = None
     description: str
-    images: List[str] = []  # Base64 encoded images
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
+    images: List[str] = []  # Base64 encoded images or existing image URLs
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     status: str = "active"  # active, draft, sold
 
 class PropertyUpdate(BaseModel):
@@ -103,10 +282,21 @@ class PropertyUpdate(BaseModel):
     view_type: Optional[str] = None
     description: Optional[str] = None
     images: Optional[List[str]] = None
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     status: Optional[str] = None
 
+class PropertyImagesAppend(BaseModel):
+    images: List[str]  # Base64 encoded images or existing image URLs
+    position: Optional[int] = Field(None, ge=0)  # Insert before this index; default appends
+
+class PropertyImagesOrder(BaseModel):
+    order: List[Union[int, str]]  # Every current index, or every image key/URL, in the new order
+
+class PropertyImages(BaseModel):
+    images: List[str]
+    updated_at: datetime
+
 class PropertyResponse(BaseModel):
     id: str
     title: str
@@ -125,6 +315,72 @@ class PropertyResponse(BaseModel):
     longitude: Optional[float] = None
     status: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class PropertyPage(BaseModel):
+    items: List[PropertyResponse]
+    next_cursor: Optional[str] = None
+
+class PropertySummary(BaseModel):
+    id: str
+    title: str
+    area: str
+    location_detail: str
+    price_usd: float
+    property_type: str
+    size_sqm: float
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    cover_image: Optional[str] = None
+    cover_thumb: Optional[str] = None
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class PropertySummaryPage(BaseModel):
+    items: List[PropertySummary]
+    next_cursor: Optional[str] = None
+
+class LeadCounts(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+
+class AdminPropertySummary(PropertySummary):
+    lead_counts: LeadCounts
+
+class AdminPropertySummaryPage(BaseModel):
+    items: List[AdminPropertySummary]
+    next_cursor: Optional[str] = None
+
+class PropertySearchHit(PropertySummary):
+    score: Optional[float] = None
+
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+class SearchFacets(BaseModel):
+    area: Dict[str, int] = {}
+    property_type: Dict[str, int] = {}
+    bedrooms: Dict[str, int] = {}
+    price: List[PriceBucket] = []
+
+class PropertySearchResponse(BaseModel):
+    items: List[PropertySearchHit]
+    next_cursor: Optional[str] = None
+    total: int
+    facets: SearchFacets
+
+class PropertyCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    min_price: float
+    max_price: float
+    property_id: Optional[str] = None
 
 class LeadCreate(BaseModel):
     property_id: str
@@ -144,6 +400,10 @@ class LeadResponse(BaseModel):
     status: str
     created_at: datetime
 
+class LeadPage(BaseModel):
+    items: List[LeadResponse]
+    next_cursor: Optional[str] = None
+
 class DashboardStats(BaseModel):
     total_properties: int
     active_properties: int
@@ -151,15 +411,162 @@ class DashboardStats(BaseModel):
     sold_properties: int
     pending_leads: int
     total_leads: int
+    properties_by_area: Dict[str, int] = {}
+    properties_by_type: Dict[str, int] = {}
+    leads_by_status: Dict[str, int] = {}
+
+# Rows read from Mongo are trusted, so list and detail endpoints build plain
+# dicts matching the response models and encode them once with orjson rather
+# than constructing and re-validating a Pydantic object per row.
+def property_to_dict(prop: dict, image_variant: Optional[str] = None) -> dict:
+    return {
+        "id": str(prop["_id"]),
+        "title": prop["title"],
+        "area": prop["area"],
+        "location_detail": prop["location_detail"],
+        "price_usd": float(prop["price_usd"]),
+        "property_type": prop["property_type"],
+        "size_sqm": float(prop["size_sqm"]),
+        "bedrooms": prop.get("bedrooms"),
+        "bathrooms": prop.get("bathrooms"),
+        "floor_level": prop.get("floor_level"),
+        "view_type": prop.get("view_type"),
+        "description": prop["description"],
+        "images": [image_url(image, image_variant) for image in prop.get("images", [])],
+        "latitude": prop.get("latitude"),
+        "longitude": prop.get("longitude"),
+        "status": prop["status"],
+        "created_at": prop["created_at"],
+        "updated_at": prop.get("updated_at") or prop["created_at"],
+    }
+
+# Only the first image is needed for the card, so slice it out server-side
+PROPERTY_SUMMARY_PROJECTION = {
+    "title": 1,
+    "area": 1,
+    "location_detail": 1,
+    "price_usd": 1,
+    "property_type": 1,
+    "size_sqm": 1,
+    "bedrooms": 1,
+    "bathrooms": 1,
+    "latitude": 1,
+    "longitude": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "images": {"$slice": 1},
+}
+
+# Aggregation $project needs the expression form of $slice
+PROPERTY_SEARCH_PROJECTION = {**PROPERTY_SUMMARY_PROJECTION, "images": {"$slice": ["$images", 1]}}
+
+def property_to_summary(prop: dict) -> dict:
+    images = prop.get("images") or []
+    return {
+        "id": str(prop["_id"]),
+        "title": prop["title"],
+        "area": prop["area"],
+        "location_detail": prop["location_detail"],
+        "price_usd": float(prop["price_usd"]),
+        "property_type": prop["property_type"],
+        "size_sqm": float(prop["size_sqm"]),
+        "bedrooms": prop.get("bedrooms"),
+        "bathrooms": prop.get("bathrooms"),
+        "latitude": prop.get("latitude"),
+        "longitude": prop.get("longitude"),
+        "cover_image": image_url(images[0], LIST_VARIANT) if images else None,
+        "cover_thumb": image_url(images[0], TILE_VARIANT) if images else None,
+        "status": prop["status"],
+        "created_at": prop["created_at"],
+        "updated_at": prop.get("updated_at") or prop["created_at"],
+    }
+
+# Write paths return only the fields the response models need, leaving out
+# internal fields such as the GeoJSON location, lead counters and name_lower
+PROPERTY_RESPONSE_PROJECTION = {"location": 0, "lead_counts": 0}
+LEAD_RESPONSE_PROJECTION = {
+    "property_id": 1,
+    "name": 1,
+    "phone": 1,
+    "message": 1,
+    "status": 1,
+    "created_at": 1,
+}
+
+def lead_to_dict(lead: dict) -> dict:
+    return {
+        "id": str(lead["_id"]),
+        "property_id": lead["property_id"],
+        "name": lead["name"],
+        "phone": lead["phone"],
+        "message": lead.get("message"),
+        "status": lead["status"],
+        "created_at": lead["created_at"],
+    }
+
+# Validators for conditional GETs. A page's ETag changes whenever any row on it
+# is updated, added or removed, so it acts as a version for that slice of the
+# collection without any shared counter between workers. Pages carry no
+# Last-Modified: the newest updated_at on a page does not move when a row
+# leaves it, so If-Modified-Since would answer 304 for a changed page.
+def encode_property(prop: dict) -> EncodedBody:
+    row = property_to_dict(prop)
+    etag = make_etag([row["id"], row["updated_at"].isoformat()])
+    return EncodedBody(dumps(row), etag, row["updated_at"])
+
+def encode_page(kind: str, items: List[dict], next_cursor: Optional[str]) -> EncodedBody:
+    parts = [kind, next_cursor or ""]
+    parts.extend(f"{item['id']}:{item['updated_at'].isoformat()}" for item in items)
+    body = dumps({"items": items, "next_cursor": next_cursor})
+    return EncodedBody(body, make_etag(parts))
+
+# Cached bodies keep their compressed variants next to them, so a hot page is
+# compressed once per encoding instead of on every request by the middleware.
+PRECOMPRESS_CACHED = os.getenv("PRECOMPRESS_CACHED", "true").lower() == "true"
+
+def send_encoded(request: Request, encoded: EncodedBody) -> Response:
+    # Bodies past the threshold go out content-coded (here or in the
+    # middleware) whenever the client accepts it, so the 304 must carry the
+    # same Vary and the same weak ETag as the 200 it revalidates
+    varies = len(encoded.body) >= COMPRESSION_MIN_SIZE
+    encoding = choose_encoding(request.headers.get("accept-encoding", "")) if varies else None
+    headers = {}
+    if encoded.etag is not None:
+        etag = encoded.etag if encoding is None else weaken_etag(encoded.etag)
+        headers = validator_headers(etag, encoded.last_modified)
+    if varies:
+        headers["Vary"] = "Accept-Encoding"
+    if encoded.etag is not None and is_not_modified(request, encoded.etag, encoded.last_modified):
+        return Response(status_code=304, headers=headers)
+    body = encoded.body
+    if PRECOMPRESS_CACHED and encoding is not None:
+        body = precompressed(encoded.compressed, encoded.body, encoding)
+        headers["Content-Encoding"] = encoding
+    return FastJSONResponse(body, headers=headers)
+
+# Clients that already hold the submitted state can send
+# "Prefer: return=minimal" (RFC 7240) to skip the response body on writes.
+def wants_minimal(request: Request) -> bool:
+    prefer = request.headers.get("prefer", "")
+    return any(token.strip().lower() == "return=minimal" for token in prefer.replace(";", ",").split(","))
+
+def minimal_response(etag: Optional[str] = None, location: Optional[str] = None) -> Response:
+    headers = {"Preference-Applied": "return=minimal"}
+    if etag is not None:
+        headers["ETag"] = etag
+    if location is not None:
+        headers["Location"] = location
+    return Response(status_code=204, headers=headers)
 
 # Auth Routes
 @api_router.post("/auth/login", response_model=AdminResponse)
 async def admin_login(credentials: AdminLogin):
     admin = await db.admins.find_one({"email": credentials.email})
-    if not admin or not verify_password(credentials.password, admin["password"]):
+    if not admin or not await verify_password(credentials.password, admin["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    token = create_access_token({"email": admin["email"]})
+    token = create_access_token({"email": admin["email"], "gen": admin.get("token_generation", 0)})
     return AdminResponse(email=admin["email"], token=token)
 
 @api_router.post("/auth/create-admin")
@@ -169,7 +576,7 @@ async def create_admin(email: EmailStr, password: str):
     if existing:
         raise HTTPException(status_code=400, detail="Admin already exists")
     
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash(password)
     await db.admins.insert_one({
         "email": email,
         "password": hashed_password,
@@ -177,15 +584,54 @@ async def create_admin(email: EmailStr, password: str):
     })
     return {"message": "Admin created successfully"}
 
+@api_router.post("/auth/change-password")
+async def change_password(
+    password_data: PasswordChange,
+    admin: dict = Depends(get_current_admin)
+):
+    stored = await db.admins.find_one({"email": admin["email"]}, {"password": 1})
+    if not stored or not await verify_password(password_data.current_password, stored["password"]):
+        raise HTTPException(status_code=401, detail="Invalid current password")
+    
+    hashed_password = await get_password_hash(password_data.new_password)
+    # Bumping the generation revokes every token issued before the change,
+    # in all workers; the caller gets a fresh one
+    updated = await db.admins.find_one_and_update(
+        {"email": admin["email"]},
+        {"$set": {"password": hashed_password}, "$inc": {"token_generation": 1}},
+        projection={"token_generation": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    invalidate_admin(admin["email"])
+    token = create_access_token({"email": admin["email"], "gen": updated["token_generation"]})
+    return {"message": "Password changed successfully", "token": token}
+
+@api_router.delete("/auth/admins/{email}")
+async def delete_admin(
+    email: EmailStr,
+    admin: dict = Depends(get_current_admin)
+):
+    if email == admin["email"]:
+        raise HTTPException(status_code=400, detail="Cannot delete your own admin account")
+    
+    result = await db.admins.delete_one({"email": email})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Admin not found")
+    invalidate_admin(email)
+    return {"message": "Admin deleted successfully"}
+
 # Property Routes
-@api_router.get("/properties", response_model=List[PropertyResponse])
-async def get_properties(
+def listing_cache_key(kind: str, query: dict, cursor: Optional[str], limit: Optional[int]) -> str:
+    # Filters are normalised so equivalent requests share an entry
+    return json.dumps([kind, query, cursor, clamp_page_size(limit)], sort_keys=True, default=str)
+
+def property_filters(
     area: Optional[str] = None,
     property_type: Optional[str] = None,
     status: Optional[str] = "active",
     min_price: Optional[float] = None,
     max_price: Optional[float] = None
-):
+) -> dict:
     query = {}
     if area:
         query["area"] = area
@@ -199,81 +645,287 @@ async def get_properties(
             query["price_usd"]["$gte"] = min_price
         if max_price:
             query["price_usd"]["$lte"] = max_price
-    
-    properties = await db.properties.find(query).sort("created_at", -1).to_list(1000)
-    return [
-        PropertyResponse(
-            id=str(prop["_id"]),
-            title=prop["title"],
-            area=prop["area"],
-            location_detail=prop["location_detail"],
-            price_usd=prop["price_usd"],
-            property_type=prop["property_type"],
-            size_sqm=prop["size_sqm"],
-            bedrooms=prop.get("bedrooms"),
-            bathrooms=prop.get("bathrooms"),
-            floor_level=prop.get("floor_level"),
-            view_type=prop.get("view_type"),
-            description=prop["description"],
-            images=prop.get("images", []),
-            latitude=prop.get("latitude"),
-            longitude=prop.get("longitude"),
-            status=prop["status"],
-            created_at=prop["created_at"]
+    return query
+
+@api_router.get("/properties", response_model=PropertyPage)
+async def get_properties(
+    request: Request,
+    query: dict = Depends(property_filters),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    cache_key = listing_cache_key("full", query, cursor, limit)
+    page = listing_cache.get(cache_key)
+    if page is None:
+        version = listing_cache.version()
+        properties, next_cursor = await get_page(db.properties, query, cursor, limit)
+        page = encode_page("full", [property_to_dict(prop, LIST_VARIANT) for prop in properties], next_cursor)
+        listing_cache.set(cache_key, page, version=version)
+    return send_encoded(request, page)
+
+@api_router.get("/properties/summary", response_model=PropertySummaryPage)
+async def get_property_summaries(
+    request: Request,
+    query: dict = Depends(property_filters),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    cache_key = listing_cache_key("summary", query, cursor, limit)
+    page = listing_cache.get(cache_key)
+    if page is None:
+        version = listing_cache.version()
+        properties, next_cursor = await get_page(
+            db.properties, query, cursor, limit, projection=PROPERTY_SUMMARY_PROJECTION
         )
-        for prop in properties
-    ]
+        page = encode_page("summary", [property_to_summary(prop) for prop in properties], next_cursor)
+        listing_cache.set(cache_key, page, version=version)
+    return send_encoded(request, page)
+
+@api_router.get("/properties/near", response_model=List[PropertySummary])
+async def get_properties_near(
+    lat: float,
+    lng: float,
+    radius_m: float = 5000,
+    limit: Optional[int] = None,
+    query: dict = Depends(property_filters)
+):
+    try:
+        geo_filter = near_query(lat, lng, radius_m)
+    except InvalidGeoQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    properties = await db.properties.find({**query, **geo_filter}, PROPERTY_SUMMARY_PROJECTION) \
+        .limit(clamp_geo_limit(limit)).to_list(None)
+    return FastJSONResponse([property_to_summary(prop) for prop in properties])
+
+@api_router.get("/properties/within", response_model=List[PropertySummary])
+async def get_properties_within(
+    min_lat: float,
+    min_lng: float,
+    max_lat: float,
+    max_lng: float,
+    limit: Optional[int] = None,
+    query: dict = Depends(property_filters)
+):
+    try:
+        geo_filter = bbox_query(min_lat, min_lng, max_lat, max_lng)
+    except InvalidGeoQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    properties = await db.properties.find({**query, **geo_filter}, PROPERTY_SUMMARY_PROJECTION) \
+        .limit(clamp_geo_limit(limit)).to_list(None)
+    return FastJSONResponse([property_to_summary(prop) for prop in properties])
+
+@api_router.get("/properties/clusters", response_model=List[PropertyCluster])
+async def get_property_clusters(
+    min_lat: float,
+    min_lng: float,
+    max_lat: float,
+    max_lng: float,
+    zoom: int,
+    status: str = "active"
+):
+    try:
+        check_bbox(min_lat, min_lng, max_lat, max_lng)
+    except InvalidGeoQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    zoom = fit_zoom(zoom, min_lat, min_lng, max_lat, max_lng)
+    if zoom <= CLUSTER_CACHE_MAX_ZOOM:
+        cache_key = (zoom, status)
+        clusters = cluster_cache.get(cache_key)
+        if clusters is None:
+            version = cluster_cache.version()
+            clusters = await build_clusters(db.properties, zoom, {"status": status})
+            cluster_cache.set(cache_key, clusters, version=version)
+    else:
+        tiles = tiles_in_bbox(zoom, min_lat, min_lng, max_lat, max_lng)
+        clusters = await clusters_for_tiles(cluster_cache, db.properties, zoom, tiles, status)
+    clusters = clusters_in_bbox(clusters, min_lat, min_lng, max_lat, max_lng)
+    # The zoom actually used, which is lower than requested for oversized bboxes
+    return FastJSONResponse(clusters, headers={"X-Cluster-Zoom": str(zoom)})
+
+@api_router.get("/properties/search", response_model=PropertySearchResponse)
+async def search_properties(
+    request: Request,
+    q: Optional[str] = None,
+    bedrooms: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    query: dict = Depends(property_filters)
+):
+    if bedrooms is not None:
+        query["bedrooms"] = bedrooms
+    
+    cache_key = listing_cache_key("search", {**query, "$q": q}, cursor, limit)
+    result = listing_cache.get(cache_key)
+    if result is None:
+        version = listing_cache.version()
+        try:
+            found = await run_search(
+                db.properties, q, query, clamp_page_size(limit), PROPERTY_SEARCH_PROJECTION, cursor
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result = EncodedBody(dumps({
+            "items": [{**property_to_summary(hit), "score": hit.get("score")} for hit in found["hits"]],
+            "next_cursor": found["next_cursor"],
+            "total": found["total"],
+            "facets": found["facets"],
+        }))
+        listing_cache.set(cache_key, result, version=version)
+    return send_encoded(request, result)
+
+# Bulk Import / Export
+PROPERTY_EXPORT_FIELDS = list(PropertyResponse.model_fields)
+LEAD_EXPORT_FIELDS = list(LeadResponse.model_fields)
+
+async def prepare_property(property_data: PropertyCreate) -> dict:
+    property_dict = property_data.dict()
+    property_dict["images"] = await store_images(property_dict["images"])
+    location = geo_point(property_dict["latitude"], property_dict["longitude"])
+    if location:
+        property_dict["location"] = location
+    # BSON dates keep milliseconds; truncating up front makes ETags built
+    # from this dict match the ones later reads produce
+    now = datetime.utcnow()
+    property_dict["created_at"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    property_dict["updated_at"] = property_dict["created_at"]
+    property_dict["lead_counts"] = empty_lead_counts()
+    return property_dict
+
+def bulk_format(requested: Optional[str], content_type: Optional[str] = None) -> str:
+    try:
+        return resolve_format(requested, content_type)
+    except BulkFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/properties/bulk")
+async def bulk_import_properties(
+    request: Request,
+    format: Optional[str] = None,
+    admin: dict = Depends(get_current_admin)
+):
+    """Import NDJSON or CSV rows as they stream in, inserting in batches.
+
+    Rows that fail to parse, validate or insert are reported by row number;
+    the rest of the upload carries on.
+    """
+    fmt = bulk_format(format, request.headers.get("content-type"))
+    received = inserted = failed = 0
+    errors: List[dict] = []
+    batch: List[tuple] = []
+
+    def record_error(row_number: int, error):
+        nonlocal failed
+        failed += 1
+        if len(errors) < BULK_MAX_ERRORS:
+            errors.append({"row": row_number, "error": error})
+
+    async def flush():
+        nonlocal inserted
+        if not batch:
+            return
+        docs = [doc for _, doc in batch]
+        try:
+            result = await db.properties.insert_many(docs, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                record_error(batch[write_error["index"]][0], write_error.get("errmsg", "Insert failed"))
+        batch.clear()
+
+    try:
+        async for row_number, row, error in parse_rows(fmt, request.stream()):
+            received += 1
+            if error:
+                record_error(row_number, error)
+                continue
+            try:
+                batch.append((row_number, await prepare_property(PropertyCreate(**row))))
+            except ValidationError as e:
+                record_error(row_number, [
+                    {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+                    for err in e.errors()
+                ])
+                continue
+            except HTTPException as e:
+                record_error(row_number, e.detail)
+                continue
+            if len(batch) >= BULK_BATCH_SIZE:
+                await flush()
+        await flush()
+    finally:
+        # Earlier batches are already stored even if the upload is cut off
+        if inserted:
+            on_properties_changed()
+    return {
+        "received": received,
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
+
+@api_router.get("/properties/export")
+async def export_properties(
+    format: Optional[str] = "ndjson",
+    query: dict = Depends(property_filters),
+    admin: dict = Depends(get_current_admin)
+):
+    """Stream every matching property; pass status= (empty) to include all statuses."""
+    fmt = bulk_format(format)
+    cursor = db.properties.find(query).sort(PAGE_SORT)
+    filename = f"properties-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        export_rows(cursor, property_to_dict, fmt, PROPERTY_EXPORT_FIELDS, dumps),
+        media_type=BULK_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @api_router.get("/properties/{property_id}", response_model=PropertyResponse)
-async def get_property(property_id: str):
+async def get_property(property_id: str, request: Request):
     if not ObjectId.is_valid(property_id):
         raise HTTPException(status_code=400, detail="Invalid property ID")
     
-    prop = await db.properties.find_one({"_id": ObjectId(property_id)})
-    if not prop:
-        raise HTTPException(status_code=404, detail="Property not found")
+    object_id = ObjectId(property_id)
+    result = property_cache.get(str(object_id))
+    if result is None:
+        version = property_cache.version()
+        prop = await db.properties.find_one({"_id": object_id})
+        if not prop:
+            raise HTTPException(status_code=404, detail="Property not found")
+        result = encode_property(prop)
+        property_cache.set(str(object_id), result, version=version)
     
-    return PropertyResponse(
-        id=str(prop["_id"]),
-        title=prop["title"],
-        area=prop["area"],
-        location_detail=prop["location_detail"],
-        price_usd=prop["price_usd"],
-        property_type=prop["property_type"],
-        size_sqm=prop["size_sqm"],
-        bedrooms=prop.get("bedrooms"),
-        bathrooms=prop.get("bathrooms"),
-        floor_level=prop.get("floor_level"),
-        view_type=prop.get("view_type"),
-        description=prop["description"],
-        images=prop.get("images", []),
-        latitude=prop.get("latitude"),
-        longitude=prop.get("longitude"),
-        status=prop["status"],
-        created_at=prop["created_at"]
-    )
+    return send_encoded(request, result)
 
 @api_router.post("/properties", response_model=PropertyResponse)
 async def create_property(
     property_data: PropertyCreate,
+    request: Request,
     admin: dict = Depends(get_current_admin)
 ):
-    property_dict = property_data.dict()
-    property_dict["created_at"] = datetime.utcnow()
-    property_dict["updated_at"] = datetime.utcnow()
+    property_dict = await prepare_property(property_data)
     
     result = await db.properties.insert_one(property_dict)
     property_dict["_id"] = result.inserted_id
+    on_properties_changed()
     
-    return PropertyResponse(
-        id=str(property_dict["_id"]),
-        **{k: v for k, v in property_dict.items() if k != "_id" and k != "updated_at"}
-    )
+    if wants_minimal(request):
+        property_id = str(result.inserted_id)
+        return minimal_response(
+            make_etag([property_id, property_dict["updated_at"].isoformat()]),
+            location=request.app.url_path_for("get_property", property_id=property_id)
+        )
+    return property_to_dict(property_dict)
 
 @api_router.put("/properties/{property_id}", response_model=PropertyResponse)
 async def update_property(
     property_id: str,
     property_data: PropertyUpdate,
+    request: Request,
     admin: dict = Depends(get_current_admin)
 ):
     if not ObjectId.is_valid(property_id):
@@ -283,21 +935,38 @@ async def update_property(
     if not update_data:
         raise HTTPException(status_code=400, detail="No data to update")
     
+    if "images" in update_data:
+        update_data["images"] = await store_images(update_data["images"])
+    if "latitude" in update_data or "longitude" in update_data:
+        coords = {k: update_data[k] for k in ("latitude", "longitude") if k in update_data}
+        if len(coords) < 2:
+            current = await db.properties.find_one(
+                {"_id": ObjectId(property_id)}, {"latitude": 1, "longitude": 1}
+            ) or {}
+            coords = {**current, **coords}
+        location = geo_point(coords.get("latitude"), coords.get("longitude"))
+        if location:
+            update_data["location"] = location
     update_data["updated_at"] = datetime.utcnow()
     
-    result = await db.properties.update_one(
+    minimal = wants_minimal(request)
+    updated_property = await db.properties.find_one_and_update(
         {"_id": ObjectId(property_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"updated_at": 1} if minimal else PROPERTY_RESPONSE_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if updated_property is None:
         raise HTTPException(status_code=404, detail="Property not found")
+    on_properties_changed(str(ObjectId(property_id)))
     
-    updated_property = await db.properties.find_one({"_id": ObjectId(property_id)})
-    return PropertyResponse(
-        id=str(updated_property["_id"]),
-        **{k: v for k, v in updated_property.items() if k != "_id" and k != "updated_at"}
-    )
+    if minimal:
+        etag = make_etag([str(updated_property["_id"]), updated_property["updated_at"].isoformat()])
+        return minimal_response(etag)
+    # Not cached here: a concurrent update can finish resuming after this
+    # one, so the next read repopulates the cache instead
+    return FastJSONResponse(encode_property(updated_property).body)
 
 @api_router.delete("/properties/{property_id}")
 async def delete_property(
@@ -310,91 +979,367 @@ async def delete_property(
     result = await db.properties.delete_one({"_id": ObjectId(property_id)})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Property not found")
+    on_properties_changed(str(ObjectId(property_id)))
     
     return {"message": "Property deleted successfully"}
 
+# Property Image Routes
+# Galleries are edited in place with $push/$pull so a change costs the
+# images it touches, not a re-upload of the whole array. Blobs are not
+# deleted on removal since other properties may share the same content.
+async def apply_image_update(property_id: str, request: Request, update, guard: Optional[dict] = None,
+                             conflict: str = "Images changed; reload and retry", conflict_status: int = 409):
+    if not ObjectId.is_valid(property_id):
+        raise HTTPException(status_code=400, detail="Invalid property ID")
+    
+    object_id = ObjectId(property_id)
+    minimal = wants_minimal(request)
+    updated_property = await db.properties.find_one_and_update(
+        {"_id": object_id, **(guard or {})},
+        update,
+        projection={"updated_at": 1} if minimal else {"images": 1, "updated_at": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if updated_property is None:
+        if guard and await db.properties.find_one({"_id": object_id}, {"_id": 1}):
+            raise HTTPException(status_code=conflict_status, detail=conflict)
+        raise HTTPException(status_code=404, detail="Property not found")
+    on_properties_changed(str(object_id))
+    
+    if minimal:
+        return minimal_response(make_etag([str(object_id), updated_property["updated_at"].isoformat()]))
+    return FastJSONResponse({
+        "images": [image_url(image) for image in updated_property.get("images", [])],
+        "updated_at": updated_property["updated_at"],
+    })
+
+@api_router.post("/properties/{property_id}/images", response_model=PropertyImages)
+async def append_property_images(
+    property_id: str,
+    payload: PropertyImagesAppend,
+    request: Request,
+    admin: dict = Depends(get_current_admin)
+):
+    if not payload.images:
+        raise HTTPException(status_code=400, detail="No images to add")
+    if not ObjectId.is_valid(property_id):
+        raise HTTPException(status_code=400, detail="Invalid property ID")
+    
+    # The gallery budget covers the images already on the property
+    current = await db.properties.find_one({"_id": ObjectId(property_id)}, {"images": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    keys = await store_images(payload.images, existing=current.get("images", []))
+    if not keys:
+        raise HTTPException(status_code=409, detail="Images are already on this property")
+    push = {"$each": keys}
+    if payload.position is not None:
+        push["$position"] = payload.position
+    # Another append may land between the read above and this write, so the
+    # filter re-checks that none of the keys arrived meanwhile and that the
+    # gallery still has room (no element at the first index that would overflow)
+    return await apply_image_update(property_id, request, {
+        "$push": {"images": push},
+        "$set": {"updated_at": datetime.utcnow()},
+    }, guard={
+        "images": {"$nin": keys},
+        f"images.{image_policy.max_images - len(keys)}": {"$exists": False},
+    })
+
+# image_ref is a path parameter so the /api/images URL form clients hold
+# (slashes and all, percent-encoded or not) reaches blob_key_from_ref
+@api_router.delete("/properties/{property_id}/images/{image_ref:path}", response_model=PropertyImages)
+async def remove_property_image(
+    property_id: str,
+    image_ref: str,
+    request: Request,
+    admin: dict = Depends(get_current_admin)
+):
+    """Remove one image by blob key, image URL or current index in the gallery."""
+    key = blob_key_from_ref(image_ref)
+    if key is not None:
+        return await apply_image_update(
+            property_id, request,
+            {"$pull": {"images": key}, "$set": {"updated_at": datetime.utcnow()}},
+            guard={"images": key}, conflict="Image not found on property", conflict_status=404
+        )
+    if not image_ref.isdigit():
+        raise HTTPException(status_code=400, detail="Image must be an image key or an index")
+    
+    # $pull matches by value, so removal by position splices the array instead
+    index = int(image_ref)
+    return await apply_image_update(
+        property_id, request,
+        [{"$set": {
+            "images": {"$concatArrays": [
+                {"$slice": ["$images", index]},
+                {"$slice": ["$images", index + 1, {"$max": [{"$size": "$images"}, 1]}]},
+            ]},
+            "updated_at": datetime.utcnow(),
+        }}],
+        guard={f"images.{index}": {"$exists": True}}, conflict="Image not found on property", conflict_status=404
+    )
+
+@api_router.put("/properties/{property_id}/images/order", response_model=PropertyImages)
+async def reorder_property_images(
+    property_id: str,
+    payload: PropertyImagesOrder,
+    request: Request,
+    admin: dict = Depends(get_current_admin)
+):
+    order = payload.order
+    if not order:
+        raise HTTPException(status_code=400, detail="order must list every image")
+    now = datetime.utcnow()
+    
+    if all(isinstance(item, int) for item in order):
+        if sorted(order) != list(range(len(order))):
+            raise HTTPException(status_code=400, detail="order must be a permutation of the image indexes")
+        # The $size guard makes sure the permutation covers the whole gallery
+        return await apply_image_update(
+            property_id, request,
+            [{"$set": {
+                "images": [{"$arrayElemAt": ["$images", index]} for index in order],
+                "updated_at": now,
+            }}],
+            guard={"images": {"$size": len(order)}}
+        )
+    
+    keys = [blob_key_from_ref(item) if isinstance(item, str) else None for item in order]
+    if None in keys or len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="order must list distinct image keys, or only indexes")
+    # Same size and containing every key means the stored array is a permutation
+    return await apply_image_update(
+        property_id, request,
+        {"$set": {"images": keys, "updated_at": now}},
+        guard={"images": {"$size": len(keys), "$all": keys}}
+    )
+
+# Image Routes
+async def send_blob(request: Request, image_key: str, variant: Optional[str] = None,
+                    cache_control: str = IMAGE_CACHE_CONTROL) -> Response:
+    # Content never changes for a given key (and variant), so it doubles as a strong ETag
+    etag = f'"{image_key}-{variant}"' if variant else f'"{image_key}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    head = await run_in_threadpool(image_store.read_head, image_key, 16, variant)
+    headers["Content-Length"] = str(await run_in_threadpool(image_store.size, image_key, variant))
+    return StreamingResponse(
+        image_store.iter_chunks(image_key, variant=variant),
+        media_type=sniff_content_type(head),
+        headers=headers
+    )
+
+@api_router.get("/images/{image_key}")
+async def get_image(image_key: str, request: Request):
+    if not is_blob_key(image_key):
+        raise HTTPException(status_code=400, detail="Invalid image ID")
+    if not await run_in_threadpool(image_store.exists, image_key):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return await send_blob(request, image_key)
+
+@api_router.get("/images/{image_key}/{variant}")
+async def get_image_variant(image_key: str, variant: str, request: Request):
+    if not is_blob_key(image_key):
+        raise HTTPException(status_code=400, detail="Invalid image ID")
+    if variant not in VARIANTS:
+        raise HTTPException(status_code=400, detail=f"variant must be one of {', '.join(VARIANTS)}")
+    if await run_in_threadpool(image_store.exists, image_key, variant):
+        return await send_blob(request, image_key, variant)
+    if not await run_in_threadpool(image_store.exists, image_key):
+        raise HTTPException(status_code=404, detail="Image not found")
+    # Not rendered yet (or Pillow unavailable): queue it and serve the original
+    variant_worker.schedule([image_key])
+    return await send_blob(request, image_key, cache_control=VARIANT_FALLBACK_CACHE_CONTROL)
+
 # Lead Routes
 @api_router.post("/leads", response_model=LeadResponse)
 async def create_lead(lead_data: LeadCreate):
-    # Verify property exists
     if not ObjectId.is_valid(lead_data.property_id):
         raise HTTPException(status_code=400, detail="Invalid property ID")
     
-    prop = await db.properties.find_one({"_id": ObjectId(lead_data.property_id)})
-    if not prop:
+    if lead_queue.buffered:
+        # The insert happens after we return; the queue bumps the counters
+        # once the lead is actually stored
+        if not await db.properties.count_documents({"_id": ObjectId(lead_data.property_id)}, limit=1):
+            raise HTTPException(status_code=404, detail="Property not found")
+    # Bumping the property's lead counters doubles as the existence check, so
+    # the property document itself is never read
+    elif not await record_new_lead(db.properties, lead_data.property_id):
         raise HTTPException(status_code=404, detail="Property not found")
     
     lead_dict = lead_data.dict()
+    lead_dict["_id"] = ObjectId()
+    lead_dict["name_lower"] = lead_dict["name"].strip().lower()
     lead_dict["status"] = "pending"
     lead_dict["created_at"] = datetime.utcnow()
     
-    result = await db.leads.insert_one(lead_dict)
-    lead_dict["_id"] = result.inserted_id
+    try:
+        await lead_queue.submit(lead_dict)
+    except (PyMongoError, RuntimeError):
+        if not lead_queue.buffered:
+            await record_new_lead(db.properties, lead_data.property_id, delta=-1)
+        raise
     
     return LeadResponse(
         id=str(lead_dict["_id"]),
         **{k: v for k, v in lead_dict.items() if k != "_id"}
     )
 
-@api_router.get("/leads", response_model=List[LeadResponse])
-async def get_leads(
+def lead_filters(
     status: Optional[str] = None,
-    admin: dict = Depends(get_current_admin)
-):
+    property_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    q: Optional[str] = None
+) -> dict:
     query = {}
     if status:
         query["status"] = status
-    
-    leads = await db.leads.find(query).sort("created_at", -1).to_list(1000)
-    return [
-        LeadResponse(
-            id=str(lead["_id"]),
-            **{k: v for k, v in lead.items() if k != "_id"}
-        )
-        for lead in leads
-    ]
+    if property_id:
+        query["property_id"] = property_id
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    if q and q.strip():
+        # Anchored prefixes so each branch can walk the name_lower/phone indexes
+        prefix = q.strip()
+        query["$or"] = [
+            {"name_lower": {"$regex": f"^{re.escape(prefix.lower())}"}},
+            {"phone": {"$regex": f"^{re.escape(prefix)}"}},
+        ]
+    return query
+
+@api_router.get("/leads", response_model=LeadPage)
+async def get_leads(
+    query: dict = Depends(lead_filters),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    admin: dict = Depends(get_current_admin)
+):
+    leads, next_cursor = await get_page(db.leads, query, cursor, limit)
+    return FastJSONResponse({"items": [lead_to_dict(lead) for lead in leads], "next_cursor": next_cursor})
+
+@api_router.get("/leads/export")
+async def export_leads(
+    format: Optional[str] = "csv",
+    query: dict = Depends(lead_filters),
+    admin: dict = Depends(get_current_admin)
+):
+    fmt = bulk_format(format)
+    cursor = db.leads.find(query).sort(PAGE_SORT)
+    filename = f"leads-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        export_rows(cursor, lead_to_dict, fmt, LEAD_EXPORT_FIELDS, dumps),
+        media_type=BULK_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @api_router.put("/leads/{lead_id}", response_model=LeadResponse)
 async def update_lead(
     lead_id: str,
     lead_data: LeadUpdate,
+    request: Request,
     admin: dict = Depends(get_current_admin)
 ):
     if not ObjectId.is_valid(lead_id):
         raise HTTPException(status_code=400, detail="Invalid lead ID")
+    if lead_data.status not in LEAD_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid lead status")
     
-    result = await db.leads.update_one(
+    # The previous status is needed to move the property's counters; the
+    # response is the same document with the new status applied
+    minimal = wants_minimal(request)
+    previous = await db.leads.find_one_and_update(
         {"_id": ObjectId(lead_id)},
-        {"$set": {"status": lead_data.status}}
+        {"$set": {"status": lead_data.status}},
+        projection={"property_id": 1, "status": 1} if minimal else LEAD_RESPONSE_PROJECTION,
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Lead not found")
+    await record_status_change(db.properties, previous["property_id"], previous["status"], lead_data.status)
+    on_leads_changed()
     
-    updated_lead = await db.leads.find_one({"_id": ObjectId(lead_id)})
-    return LeadResponse(
-        id=str(updated_lead["_id"]),
-        **{k: v for k, v in updated_lead.items() if k != "_id"}
+    if minimal:
+        return minimal_response()
+    return FastJSONResponse(lead_to_dict({**previous, "status": lead_data.status}))
+
+# Admin Property List
+@api_router.get("/admin/properties", response_model=AdminPropertySummaryPage)
+async def get_admin_properties(
+    status: Optional[str] = None,
+    sort: str = "created",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    admin: dict = Depends(get_current_admin)
+):
+    """Property cards with their lead counters, optionally ordered by interest."""
+    if sort not in PROPERTY_LEAD_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(PROPERTY_LEAD_SORTS)}")
+    query = {"status": status} if status else {}
+    properties, next_cursor = await get_page(
+        db.properties, query, cursor, limit,
+        {**PROPERTY_SUMMARY_PROJECTION, "lead_counts": 1}, PROPERTY_LEAD_SORTS[sort]
     )
+    items = [
+        {**property_to_summary(prop), "lead_counts": lead_counts_to_dict(prop.get("lead_counts"))}
+        for prop in properties
+    ]
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor})
 
 # Dashboard Stats
 @api_router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats(admin: dict = Depends(get_current_admin)):
-    total_properties = await db.properties.count_documents({})
-    active_properties = await db.properties.count_documents({"status": "active"})
-    draft_properties = await db.properties.count_documents({"status": "draft"})
-    sold_properties = await db.properties.count_documents({"status": "sold"})
-    pending_leads = await db.leads.count_documents({"status": "pending"})
-    total_leads = await db.leads.count_documents({})
-    
-    return DashboardStats(
-        total_properties=total_properties,
-        active_properties=active_properties,
-        draft_properties=draft_properties,
-        sold_properties=sold_properties,
-        pending_leads=pending_leads,
-        total_leads=total_leads
-    )
+    stats = dashboard_cache.get("stats")
+    if stats is None:
+        version = dashboard_cache.version()
+        stats = DashboardStats(**await compute_dashboard_stats(db))
+        dashboard_cache.set("stats", stats, version=version)
+    return stats
+
+# Runtime Stats
+@api_router.get("/admin/runtime-stats")
+async def get_runtime_stats(admin: dict = Depends(get_current_admin)):
+    return {
+        "password_hashing": password_hasher.stats(),
+        "lead_queue": lead_queue.stats(),
+        "image_variants": variant_worker.stats(),
+        "caches": [
+            dashboard_cache.stats(),
+            admin_cache.stats(),
+            property_cache.stats(),
+            listing_cache.stats(),
+            cluster_cache.stats(),
+        ],
+    }
+
+# Index Report
+@api_router.get("/admin/indexes")
+async def get_index_report(admin: dict = Depends(get_current_admin)):
+    return await explain_report(db)
+
+# Prometheus scrape endpoint, outside /api. Set METRICS_TOKEN to require it
+# as a bearer token.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    gauges = {
+        "lead_queue_pending": ("Leads waiting for the next batch insert", lead_queue.stats()["pending"]),
+        "image_variant_queued": ("Images waiting for variant rendering", variant_worker.stats()["queued"]),
+        "password_hash_in_flight": ("Password hashes queued or running", password_hasher.stats()["in_flight"]),
+    }
+    return Response(registry.render(gauges), media_type=PROMETHEUS_CONTENT_TYPE)
 
 # Include router
 app.include_router(api_router)
@@ -407,6 +1352,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=image_policy.max_request_bytes,
+    exempt_paths=["/api/properties/bulk"]
+)
+app.add_middleware(SlowRequestMiddleware, client=client)
+app.add_middleware(ProfilingMiddleware, is_admin=is_admin_token)
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -414,6 +1369,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    await ensure_indexes(db)
+
+@app.on_event("startup")
+async def start_lead_queue():
+    lead_queue.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await lead_queue.stop()
     client.close()
+    password_hasher.shutdown()
+    variant_worker.shutdown()
@@ -133,19 +133,22 @@ try:
         
         headers = {"Authorization": f"Bearer {token}"}
         
-        for i, prop in enumerate(properties, 1):
-            try:
-                response = requests.post(
-                    f"{BACKEND_URL}/api/properties",
-                    json=prop,
-                    headers=headers
-                )
-                if response.status_code == 200:
-                    print(f"  ✓ Property {i}: {prop['title']}")
-                else:
-                    print(f"  ✗ Property {i} failed: {response.text}")
-            except Exception as e:
-                print(f"  ✗ Property {i} error: {e}")
+        # One streamed NDJSON upload instead of a request per property
+        try:
+            response = requests.post(
+                f"{BACKEND_URL}/api/properties/bulk",
+                data="\n".join(json.dumps(prop) for prop in properties).encode(),
+                headers={**headers, "Content-Type": "application/x-ndjson"}
+            )
+            if response.status_code == 200:
+                result = response.json()
+                print(f"  ✓ Imported {result['inserted']} of {result['received']} properties")
+                for error in result["errors"]:
+                    print(f"  ✗ Property {error['row']} failed: {error['error']}")
+            else:
+                print(f"  ✗ Bulk import failed: {response.text}")
+        except Exception as e:
+            print(f"  ✗ Bulk import error: {e}")
         
         print("\n" + "="*60)
         print("SETUP COMPLETE!")
@@ -117,11 +117,11 @@ class APITester:
             
             if response.status_code == 200:
                 data = response.json()
-                if isinstance(data, list):
-                    self.log_result("Get All Properties", True, f"Retrieved {len(data)} properties")
-                    return data
+                if isinstance(data.get("items"), list) and "next_cursor" in data:
+                    self.log_result("Get All Properties", True, f"Retrieved {len(data['items'])} properties")
+                    return data["items"]
                 else:
-                    self.log_result("Get All Properties", False, "Response is not a list", response)
+                    self.log_result("Get All Properties", False, "Response is not a page of items", response)
             else:
                 self.log_result("Get All Properties", False, "Failed to get properties", response)
         except Exception as e:
@@ -135,7 +135,7 @@ class APITester:
             
             if response.status_code == 200:
                 data = response.json()
-                beirut_count = len([p for p in data if p.get("area") == "Beirut"])
+                beirut_count = len([p for p in data["items"] if p.get("area") == "Beirut"])
                 self.log_result("Filter Properties (Beirut)", True, f"Found {beirut_count} properties in Beirut")
             else:
                 self.log_result("Filter Properties (Beirut)", False, "Failed to filter properties", response)
@@ -149,7 +149,7 @@ class APITester:
             
             if response.status_code == 200:
                 data = response.json()
-                ml_count = len([p for p in data if p.get("area") == "Mount Lebanon"])
+                ml_count = len([p for p in data["items"] if p.get("area") == "Mount Lebanon"])
                 self.log_result("Filter Properties (Mount Lebanon)", True, f"Found {ml_count} properties in Mount Lebanon")
             else:
                 self.log_result("Filter Properties (Mount Lebanon)", False, "Failed to filter properties", response)
@@ -310,10 +310,10 @@ class APITester:
             
             if response.status_code == 200:
                 data = response.json()
-                if isinstance(data, list):
-                    self.log_result("Get Leads (Admin)", True, f"Retrieved {len(data)} leads")
+                if isinstance(data.get("items"), list):
+                    self.log_result("Get Leads (Admin)", True, f"Retrieved {len(data['items'])} leads")
                 else:
-                    self.log_result("Get Leads (Admin)", False, "Response is not a list", response)
+                    self.log_result("Get Leads (Admin)", False, "Response is not a page of items", response)
             else:
                 self.log_result("Get Leads (Admin)", False, "Failed to get leads", response)
         except Exception as e:
@@ -350,7 +350,7 @@ class APITester:
             
             if response.status_code == 200:
                 data = response.json()
-                pending_count = len([l for l in data if l.get("status") == "pending"])
+                pending_count = len([l for l in data["items"] if l.get("status") == "pending"])
                 self.log_result("Filter Leads (Pending)", True, f"Found {pending_count} pending leads")
             else:
                 self.log_result("Filter Leads (Pending)", False, "Failed to filter leads", response)
@@ -16,6 +16,7 @@ import { useRouter } from 'expo-router';
 import { Ionicons } from '@expo/vector-icons';
 import { SafeAreaView } from 'react-native-safe-area-context';
 import axios from 'axios';
+import { imageUri } from '../../utils/images';
 
 const GOLD = '#D4AF37';
 const BLACK = '#000000';
@@ -28,7 +29,7 @@ interface Property {
   location_detail: string;
   price_usd: number;
   property_type: string;
-  images: string[];
+  cover_image?: string;
 }
 
 export default function HomeScreen() {
@@ -43,8 +44,8 @@ export default function HomeScreen() {
 
   const fetchProperties = async () => {
     try {
-      const response = await axios.get(`${BACKEND_URL}/api/properties?status=active`);
-      setProperties(response.data.slice(0, 6)); // Show only first 6 on home
+      const response = await axios.get(`${BACKEND_URL}/api/properties/summary?status=active&limit=6`);
+      setProperties(response.data.items); // Show only first 6 on home
       setLoading(false);
     } catch (error) {
       console.error('Error fetching properties:', error);
@@ -127,9 +128,9 @@ export default function HomeScreen() {
                   style={styles.propertyCard}
                   onPress={() => router.push(`/property/${property.id}`)}
                 >
-                  {property.images && property.images.length > 0 ? (
+                  {property.cover_image ? (
                     <Image
-                      source={{ uri: property.images[0] }}
+                      source={{ uri: imageUri(property.cover_image) }}
                       style={styles.propertyImage}
                       resizeMode="cover"
                     />
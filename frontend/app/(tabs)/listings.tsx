@@ -14,6 +14,7 @@ import { useRouter } from 'expo-router';
 import { Ionicons } from '@expo/vector-icons';
 import { SafeAreaView } from 'react-native-safe-area-context';
 import axios from 'axios';
+import { imageUri } from '../../utils/images';
 
 const GOLD = '#D4AF37';
 const BLACK = '#000000';
@@ -29,7 +30,7 @@ interface Property {
   size_sqm: number;
   bedrooms?: number;
   bathrooms?: number;
-  images: string[];
+  cover_image?: string;
 }
 
 export default function ListingsScreen() {
@@ -38,19 +39,49 @@ export default function ListingsScreen() {
   const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedArea, setSelectedArea] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   useEffect(() => {
-    fetchProperties();
-  }, [selectedArea]);
+    if (!searchQuery) {
+      fetchProperties();
+      return;
+    }
+    // Debounce server-side search while the user is typing
+    const timer = setTimeout(() => searchProperties(), 300);
+    return () => clearTimeout(timer);
+  }, [selectedArea, searchQuery]);
+
+  const searchProperties = async (cursor?: string) => {
+    try {
+      const params: Record<string, string> = { status: 'active', q: searchQuery };
+      if (selectedArea) {
+        params.area = selectedArea;
+      }
+      if (cursor) {
+        params.cursor = cursor;
+      }
+      const response = await axios.get(`${BACKEND_URL}/api/properties/search`, { params });
+      setProperties(cursor ? [...properties, ...response.data.items] : response.data.items);
+      setNextCursor(response.data.next_cursor);
+      setLoading(false);
+    } catch (error) {
+      console.error('Error searching properties:', error);
+      setLoading(false);
+    }
+  };
 
-  const fetchProperties = async () => {
+  const fetchProperties = async (cursor?: string) => {
     try {
-      let url = `${BACKEND_URL}/api/properties?status=active`;
+      let url = `${BACKEND_URL}/api/properties/summary?status=active`;
       if (selectedArea) {
         url += `&area=${selectedArea}`;
       }
+      if (cursor) {
+        url += `&cursor=${cursor}`;
+      }
       const response = await axios.get(url);
-      setProperties(response.data);
+      setProperties(cursor ? [...properties, ...response.data.items] : response.data.items);
+      setNextCursor(response.data.next_cursor);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching properties:', error);
@@ -58,25 +89,29 @@ export default function ListingsScreen() {
     }
   };
 
+  const loadMore = () => {
+    if (!nextCursor) {
+      return;
+    }
+    if (searchQuery) {
+      searchProperties(nextCursor);
+    } else {
+      fetchProperties(nextCursor);
+    }
+  };
+
   const formatPrice = (price: number) => {
     return `$${price.toLocaleString('en-US')}`;
   };
 
-  const filteredProperties = properties.filter((property) =>
-    property.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-    property.location_detail.toLowerCase().includes(searchQuery.toLowerCase()) ||
-    property.area.toLowerCase().includes(searchQuery.toLowerCase()) ||
-    property.property_type.toLowerCase().includes(searchQuery.toLowerCase())
-  );
-
   const renderProperty = ({ item }: { item: Property }) => (
     <TouchableOpacity
       style={styles.propertyCard}
       onPress={() => router.push(`/property/${item.id}`)}
     >
-      {item.images && item.images.length > 0 ? (
+      {item.cover_image ? (
         <Image
-          source={{ uri: item.images[0] }}
+          source={{ uri: imageUri(item.cover_image) }}
           style={styles.propertyImage}
           resizeMode="cover"
         />
@@ -189,10 +224,12 @@ export default function ListingsScreen() {
         <ActivityIndicator size="large" color={GOLD} style={styles.loader} />
       ) : (
         <FlatList
-          data={filteredProperties}
+          data={properties}
           renderItem={renderProperty}
           keyExtractor={(item) => item.id}
           contentContainerStyle={styles.listContent}
+          onEndReached={loadMore}
+          onEndReachedThreshold={0.5}
           ListEmptyComponent={
             <View style={styles.emptyContainer}>
               <Ionicons name="home-outline" size={64} color="#666" />
@@ -34,30 +34,38 @@ const DEFAULT_REGION = {
   longitudeDelta: 0.3,
 };
 
-interface Property {
-  id: string;
-  title: string;
-  price_usd: number;
-  latitude?: number;
-  longitude?: number;
+interface Cluster {
+  latitude: number;
+  longitude: number;
+  count: number;
+  min_price: number;
+  max_price: number;
+  property_id?: string;
 }
 
 export default function MapScreen() {
   const router = useRouter();
-  const [properties, setProperties] = useState<Property[]>([]);
+  const [properties, setProperties] = useState<Cluster[]>([]);
   const [region, setRegion] = useState(DEFAULT_REGION);
 
   useEffect(() => {
-    fetchProperties();
-  }, []);
+    fetchProperties(region);
+  }, [region]);
 
-  const fetchProperties = async () => {
+  // Load server-side clusters for the visible viewport only
+  const fetchProperties = async (bounds: typeof DEFAULT_REGION) => {
     try {
-      const response = await axios.get(`${BACKEND_URL}/api/properties?status=active`);
-      const propertiesWithLocation = response.data.filter(
-        (prop: Property) => prop.latitude && prop.longitude
-      );
-      setProperties(propertiesWithLocation);
+      const response = await axios.get(`${BACKEND_URL}/api/properties/clusters`, {
+        params: {
+          status: 'active',
+          zoom: Math.round(Math.log2(360 / bounds.longitudeDelta)),
+          min_lat: bounds.latitude - bounds.latitudeDelta / 2,
+          max_lat: bounds.latitude + bounds.latitudeDelta / 2,
+          min_lng: bounds.longitude - bounds.longitudeDelta / 2,
+          max_lng: bounds.longitude + bounds.longitudeDelta / 2,
+        },
+      });
+      setProperties(response.data);
     } catch (error) {
       console.error('Error fetching properties:', error);
     }
@@ -89,17 +97,23 @@ export default function MapScreen() {
             onRegionChangeComplete={setRegion}
             customMapStyle={mapDarkStyle}
           >
-            {properties.map((property) => (
+            {properties.map((cluster) => (
               <Marker
-                key={property.id}
+                key={`${cluster.latitude},${cluster.longitude}`}
                 coordinate={{
-                  latitude: property.latitude!,
-                  longitude: property.longitude!,
+                  latitude: cluster.latitude,
+                  longitude: cluster.longitude,
                 }}
-                onPress={() => handleMarkerPress(property.id)}
+                onPress={() => cluster.property_id && handleMarkerPress(cluster.property_id)}
               >
                 <View style={styles.markerContainer}>
-                  <Ionicons name="location" size={40} color={GOLD} />
+                  {cluster.count > 1 ? (
+                    <View style={styles.clusterBubble}>
+                      <Text style={styles.clusterText}>{cluster.count}</Text>
+                    </View>
+                  ) : (
+                    <Ionicons name="location" size={40} color={GOLD} />
+                  )}
                 </View>
               </Marker>
             ))}
@@ -246,6 +260,19 @@ const styles = StyleSheet.create({
     alignItems: 'center',
     justifyContent: 'center',
   },
+  clusterBubble: {
+    minWidth: 36,
+    height: 36,
+    borderRadius: 18,
+    paddingHorizontal: 8,
+    backgroundColor: GOLD,
+    alignItems: 'center',
+    justifyContent: 'center',
+  },
+  clusterText: {
+    color: BLACK,
+    fontWeight: 'bold',
+  },
   noPropertiesOverlay: {
     position: 'absolute',
     top: '40%',
@@ -96,7 +96,7 @@ export default function EditPropertyScreen() {
       if (viewType) updateData.view_type = viewType;
 
       await axios.put(`${BACKEND_URL}/api/properties/${id}`, updateData, {
-        headers: { Authorization: `Bearer ${token}` },
+        headers: { Authorization: `Bearer ${token}`, Prefer: 'return=minimal' },
       });
 
       Alert.alert('Success', 'Property updated successfully!');
@@ -7,6 +7,7 @@ import {
   TouchableOpacity,
   ActivityIndicator,
   Alert,
+  TextInput,
 } from 'react-native';
 import { Stack, useRouter } from 'expo-router';
 import { Ionicons } from '@expo/vector-icons';
@@ -33,12 +34,16 @@ export default function AdminLeadsScreen() {
   const [leads, setLeads] = useState<Lead[]>([]);
   const [loading, setLoading] = useState(true);
   const [selectedStatus, setSelectedStatus] = useState<string | null>(null);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   useEffect(() => {
-    fetchLeads();
-  }, [selectedStatus]);
+    // Name/phone search runs on the server; debounce so typing isn't a request per key
+    const timer = setTimeout(() => fetchLeads(), searchQuery ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [selectedStatus, searchQuery]);
 
-  const fetchLeads = async () => {
+  const fetchLeads = async (cursor?: string) => {
     try {
       const token = await AsyncStorage.getItem('admin_token');
       if (!token) {
@@ -47,15 +52,23 @@ export default function AdminLeadsScreen() {
         return;
       }
 
-      let url = `${BACKEND_URL}/api/leads`;
+      const params: Record<string, string> = {};
       if (selectedStatus) {
-        url += `?status=${selectedStatus}`;
+        params.status = selectedStatus;
+      }
+      if (searchQuery.trim()) {
+        params.q = searchQuery.trim();
+      }
+      if (cursor) {
+        params.cursor = cursor;
       }
 
-      const response = await axios.get(url, {
+      const response = await axios.get(`${BACKEND_URL}/api/leads`, {
+        params,
         headers: { Authorization: `Bearer ${token}` },
       });
-      setLeads(response.data);
+      setLeads(cursor ? [...leads, ...response.data.items] : response.data.items);
+      setNextCursor(response.data.next_cursor);
       setLoading(false);
     } catch (error: any) {
       console.error('Error fetching leads:', error);
@@ -73,7 +86,7 @@ export default function AdminLeadsScreen() {
       await axios.put(
         `${BACKEND_URL}/api/leads/${leadId}`,
         { status: newStatus },
-        { headers: { Authorization: `Bearer ${token}` } }
+        { headers: { Authorization: `Bearer ${token}`, Prefer: 'return=minimal' } }
       );
       fetchLeads();
       Alert.alert('Success', 'Lead status updated');
@@ -155,6 +168,19 @@ export default function AdminLeadsScreen() {
         }}
       />
       <SafeAreaView style={styles.container} edges={['bottom']}>
+        {/* Search */}
+        <View style={styles.searchContainer}>
+          <Ionicons name="search" size={20} color={GOLD} style={styles.searchIcon} />
+          <TextInput
+            style={styles.searchInput}
+            placeholder="Search by name or phone..."
+            placeholderTextColor="#666"
+            value={searchQuery}
+            onChangeText={setSearchQuery}
+            autoCapitalize="none"
+          />
+        </View>
+
         {/* Filter Buttons */}
         <View style={styles.filterContainer}>
           <TouchableOpacity
@@ -200,6 +226,8 @@ export default function AdminLeadsScreen() {
             renderItem={renderLead}
             keyExtractor={(item) => item.id}
             contentContainerStyle={styles.listContent}
+            onEndReached={() => nextCursor && fetchLeads(nextCursor)}
+            onEndReachedThreshold={0.5}
             ListEmptyComponent={
               <View style={styles.emptyContainer}>
                 <Ionicons name="people-outline" size={64} color="#666" />
@@ -218,6 +246,26 @@ const styles = StyleSheet.create({
     flex: 1,
     backgroundColor: BLACK,
   },
+  searchContainer: {
+    flexDirection: 'row',
+    alignItems: 'center',
+    marginHorizontal: 16,
+    marginTop: 12,
+    paddingHorizontal: 16,
+    paddingVertical: 10,
+    backgroundColor: '#1a1a1a',
+    borderRadius: 8,
+    borderWidth: 1,
+    borderColor: GOLD,
+  },
+  searchIcon: {
+    marginRight: 8,
+  },
+  searchInput: {
+    flex: 1,
+    color: '#fff',
+    fontSize: 16,
+  },
   filterContainer: {
     flexDirection: 'row',
     paddingHorizontal: 16,
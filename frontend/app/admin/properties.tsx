@@ -14,6 +14,7 @@ import { Ionicons } from '@expo/vector-icons';
 import { SafeAreaView } from 'react-native-safe-area-context';
 import axios from 'axios';
 import AsyncStorage from '@react-native-async-storage/async-storage';
+import { imageUri } from '../../utils/images';
 
 const GOLD = '#D4AF37';
 const BLACK = '#000000';
@@ -26,20 +27,33 @@ interface Property {
   price_usd: number;
   property_type: string;
   status: string;
-  images: string[];
+  cover_image?: string;
+  cover_thumb?: string;
+  lead_counts: {
+    total: number;
+    by_status: Record<string, number>;
+  };
 }
 
+const SORT_OPTIONS = [
+  { key: 'created', label: 'Newest' },
+  { key: 'leads', label: 'Most Leads' },
+  { key: 'pending_leads', label: 'Pending Leads' },
+];
+
 export default function AdminPropertiesScreen() {
   const router = useRouter();
   const [properties, setProperties] = useState<Property[]>([]);
   const [loading, setLoading] = useState(true);
   const [deleting, setDeleting] = useState<string | null>(null);
+  const [sort, setSort] = useState('created');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   useEffect(() => {
     fetchProperties();
-  }, []);
+  }, [sort]);
 
-  const fetchProperties = async () => {
+  const fetchProperties = async (cursor?: string) => {
     try {
       const token = await AsyncStorage.getItem('admin_token');
       if (!token) {
@@ -48,8 +62,12 @@ export default function AdminPropertiesScreen() {
         return;
       }
 
-      const response = await axios.get(`${BACKEND_URL}/api/properties`);
-      setProperties(response.data);
+      const response = await axios.get(`${BACKEND_URL}/api/admin/properties`, {
+        params: cursor ? { sort, cursor } : { sort },
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      setProperties((current) => (cursor ? [...current, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.next_cursor);
       setLoading(false);
     } catch (error: any) {
       console.error('Error fetching properties:', error);
@@ -116,9 +134,9 @@ export default function AdminPropertiesScreen() {
 
   const renderProperty = ({ item }: { item: Property }) => (
     <View style={styles.propertyCard}>
-      {item.images && item.images.length > 0 ? (
+      {item.cover_thumb ? (
         <Image
-          source={{ uri: item.images[0] }}
+          source={{ uri: imageUri(item.cover_thumb) }}
           style={styles.propertyImage}
           resizeMode="cover"
         />
@@ -138,6 +156,10 @@ export default function AdminPropertiesScreen() {
         </View>
         <Text style={styles.propertyMeta}>{item.area} • {item.property_type}</Text>
         <Text style={styles.propertyPrice}>${item.price_usd.toLocaleString('en-US')}</Text>
+        <Text style={styles.leadCounts}>
+          <Ionicons name="people" size={12} color={GOLD} /> {item.lead_counts.total} leads
+          {' • '}{item.lead_counts.by_status.pending || 0} pending
+        </Text>
         
         <View style={styles.actionButtons}>
           <TouchableOpacity
@@ -183,6 +205,21 @@ export default function AdminPropertiesScreen() {
         }}
       />
       <SafeAreaView style={styles.container} edges={['bottom']}>
+        {/* Sort Buttons */}
+        <View style={styles.sortContainer}>
+          {SORT_OPTIONS.map((option) => (
+            <TouchableOpacity
+              key={option.key}
+              style={[styles.sortButton, sort === option.key && styles.sortButtonActive]}
+              onPress={() => setSort(option.key)}
+            >
+              <Text style={[styles.sortButtonText, sort === option.key && styles.sortButtonTextActive]}>
+                {option.label}
+              </Text>
+            </TouchableOpacity>
+          ))}
+        </View>
+
         {loading ? (
           <ActivityIndicator size="large" color={GOLD} style={styles.loader} />
         ) : (
@@ -191,6 +228,8 @@ export default function AdminPropertiesScreen() {
             renderItem={renderProperty}
             keyExtractor={(item) => item.id}
             contentContainerStyle={styles.listContent}
+            onEndReached={() => nextCursor && fetchProperties(nextCursor)}
+            onEndReachedThreshold={0.5}
             ListEmptyComponent={
               <View style={styles.emptyContainer}>
                 <Ionicons name="home-outline" size={64} color="#666" />
@@ -216,6 +255,31 @@ const styles = StyleSheet.create({
     flex: 1,
     backgroundColor: BLACK,
   },
+  sortContainer: {
+    flexDirection: 'row',
+    paddingHorizontal: 16,
+    paddingTop: 12,
+    gap: 8,
+  },
+  sortButton: {
+    paddingVertical: 8,
+    paddingHorizontal: 12,
+    backgroundColor: '#1a1a1a',
+    borderRadius: 16,
+    borderWidth: 1,
+    borderColor: GOLD,
+  },
+  sortButtonActive: {
+    backgroundColor: GOLD,
+  },
+  sortButtonText: {
+    color: GOLD,
+    fontSize: 12,
+    fontWeight: '600',
+  },
+  sortButtonTextActive: {
+    color: BLACK,
+  },
   listContent: {
     padding: 16,
   },
@@ -273,6 +337,11 @@ const styles = StyleSheet.create({
     fontSize: 18,
     fontWeight: 'bold',
     color: GOLD,
+    marginBottom: 4,
+  },
+  leadCounts: {
+    fontSize: 12,
+    color: '#999',
     marginBottom: 12,
   },
   actionButtons: {
@@ -20,6 +20,7 @@ import { useLocalSearchParams, useRouter } from 'expo-router';
 import { Ionicons } from '@expo/vector-icons';
 import { SafeAreaView } from 'react-native-safe-area-context';
 import axios from 'axios';
+import { imageUri } from '../../utils/images';
 
 const GOLD = '#D4AF37';
 const BLACK = '#000000';
@@ -288,7 +289,7 @@ export default function PropertyDetailScreen() {
                   {property.images.map((image, index) => (
                     <Image
                       key={index}
-                      source={{ uri: image }}
+                      source={{ uri: imageUri(image) }}
                       style={styles.propertyImage}
                       resizeMode="cover"
                     />
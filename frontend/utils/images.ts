@@ -0,0 +1,8 @@
+const BACKEND_URL = process.env.EXPO_PUBLIC_BACKEND_URL;
+
+// The API returns /api/images/... paths when PUBLIC_BASE_URL is not set on
+// the server. React Native cannot load relative URIs, so anchor them to the
+// backend; absolute URLs and inline data URIs pass through unchanged.
+export function imageUri(uri: string): string {
+  return uri.startsWith('/') ? `${BACKEND_URL}${uri}` : uri;
+}
@@ -0,0 +1,96 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other flat, as they do when run from
+# backend/backend
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "backend"))
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The API module, with blobs under a temp dir; Mongo is swapped per test by ``api``."""
+    pytest.importorskip("mongomock_motor")
+    os.environ["BLOB_STORE_PATH"] = str(tmp_path_factory.mktemp("blobs"))
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "test_database")
+    import server as module
+    # Startup would build indexes and start the lead queue against real Mongo
+    module.app.router.on_startup.clear()
+    return module
+
+
+@pytest.fixture
+def api(server, monkeypatch):
+    from fastapi.testclient import TestClient
+    from mongomock_motor import AsyncMongoMockClient
+
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", client["test"])
+    monkeypatch.setattr(server.lead_queue, "collection", client["test"].leads)
+    for cache in (server.dashboard_cache, server.admin_cache, server.property_cache,
+                  server.listing_cache, server.cluster_cache):
+        cache.clear()
+    server.admin_generations.clear()
+    return TestClient(server.app)
+
+
+@pytest.fixture
+def live_api(server, monkeypatch):
+    """Like ``api``, but against the MongoDB at TEST_MONGO_URL, for updates mongomock can't run."""
+    url = os.getenv("TEST_MONGO_URL")
+    if not url:
+        pytest.skip("TEST_MONGO_URL is not set")
+    from fastapi.testclient import TestClient
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(url)
+    database = client[f"test_{uuid.uuid4().hex}"]
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server.lead_queue, "collection", database.leads)
+    # Shutdown would stop the workers the other tests share
+    monkeypatch.setattr(server.app.router, "on_shutdown", [])
+    for cache in (server.dashboard_cache, server.admin_cache, server.property_cache,
+                  server.listing_cache, server.cluster_cache):
+        cache.clear()
+    server.admin_generations.clear()
+    # One event loop for every request, as Motor binds to the first one it sees
+    with TestClient(server.app) as test_client:
+        yield test_client
+        test_client.portal.call(client.drop_database, database.name)
+
+
+@pytest.fixture
+def login(api):
+    """Create an admin if needed and return bearer headers for it."""
+    def login(email="admin@example.com", password="secret"):
+        api.post("/api/auth/create-admin", params={"email": email, "password": password})
+        response = api.post("/api/auth/login", json={"email": email, "password": password})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+    return login
+
+
+@pytest.fixture
+def admin_headers(login):
+    return login()
+
+
+@pytest.fixture
+def make_property(api, admin_headers):
+    """Create a property through the API and return the response body."""
+    def make_property(**fields):
+        payload = {
+            "title": "Sea view apartment", "area": "Beirut", "location_detail": "Hamra",
+            "price_usd": 250000, "property_type": "Apartment", "size_sqm": 120,
+            "description": "Bright and quiet", **fields,
+        }
+        response = api.post("/api/properties", headers=admin_headers, json=payload)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make_property
@@ -0,0 +1,71 @@
+import asyncio
+
+
+def test_old_token_is_rejected_after_password_change(api, admin_headers):
+    assert api.get("/api/dashboard/stats", headers=admin_headers).status_code == 200
+    response = api.post("/api/auth/change-password", headers=admin_headers,
+                        json={"current_password": "secret", "new_password": "changed"})
+    assert response.status_code == 200
+    new_headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    response = api.get("/api/dashboard/stats", headers=admin_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    assert api.get("/api/dashboard/stats", headers=new_headers).status_code == 200
+    assert api.post("/api/auth/login", json={"email": "admin@example.com", "password": "secret"}).status_code == 401
+
+
+def test_other_workers_reject_the_old_token_once_their_cache_misses(api, admin_headers, server):
+    api.post("/api/auth/change-password", headers=admin_headers,
+             json={"current_password": "secret", "new_password": "changed"})
+    # Another worker never saw the generation bump: only the admin document knows
+    server.admin_generations.clear()
+    server.admin_cache.clear()
+    assert api.get("/api/dashboard/stats", headers=admin_headers).status_code == 401
+
+
+def test_token_of_deleted_admin_is_rejected(api, admin_headers, login):
+    other = login("other@example.com", "pw")
+    assert api.get("/api/dashboard/stats", headers=other).status_code == 200
+    assert api.delete("/api/auth/admins/other@example.com", headers=admin_headers).status_code == 200
+    response = api.get("/api/dashboard/stats", headers=other)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Admin not found"
+
+
+def test_generation_bump_invalidates_the_cached_principal(api, admin_headers, server):
+    token = admin_headers["Authorization"].split()[1]
+    api.get("/api/dashboard/stats", headers=admin_headers)
+    assert server.admin_cache.get(token) is not None
+
+    async def remove_admin():
+        await server.db.admins.delete_one({"email": "admin@example.com"})
+
+    asyncio.run(remove_admin())
+    # Served from the cache without touching Mongo
+    assert api.get("/api/dashboard/stats", headers=admin_headers).status_code == 200
+
+    server.invalidate_admin("admin@example.com")
+    response = api.get("/api/dashboard/stats", headers=admin_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Admin not found"
+
+
+def test_password_work_runs_on_the_bcrypt_pool(api, server, login):
+    completed = server.password_hasher.stats()["completed"]
+    login("pool@example.com", "pw")
+    assert api.post("/api/auth/login", json={"email": "pool@example.com", "password": "wrong"}).status_code == 401
+    # create-admin hashes; each login verifies
+    assert server.password_hasher.stats()["completed"] == completed + 3
+
+
+def test_overloaded_pool_returns_503(api, admin_headers, server, monkeypatch):
+    from password_hashing import HashingOverloaded
+
+    async def overloaded(*args):
+        raise HashingOverloaded("Too many password operations in flight")
+
+    monkeypatch.setattr(server.password_hasher, "_run", overloaded)
+    response = api.post("/api/auth/login", json={"email": "admin@example.com", "password": "secret"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,55 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from blob_store import BlobError, LocalBlobStore, blob_key, blob_key_from_ref, image_url, store_image
+
+
+def test_put_is_content_addressed(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    key = store.put(b"photo bytes")
+    assert key == blob_key(b"photo bytes")
+    assert store.put(b"photo bytes") == key
+    assert b"".join(store.iter_chunks(key)) == b"photo bytes"
+
+
+def test_concurrent_puts_of_same_key_publish_whole_file(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    data = b"\xff" * (2 * 1024 * 1024)
+    key = blob_key(data)
+    path = store._path(key)
+
+    def write(_):
+        store._write(path, data)
+        return path.stat().st_size
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sizes = list(pool.map(write, range(32)))
+
+    assert sizes == [len(data)] * 32
+    assert b"".join(store.iter_chunks(key)) == data
+    # No temp files are left behind next to the blob
+    assert [p.name for p in path.parent.iterdir()] == [key]
+
+
+def test_invalid_key_is_rejected(tmp_path):
+    with pytest.raises(BlobError):
+        LocalBlobStore(tmp_path).exists("../../etc/passwd")
+
+
+def test_store_image_decodes_data_uri(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    key = store_image(store, "data:image/png;base64," + base64.b64encode(b"\x89PNG\r\n\x1a\nxx").decode())
+    assert store.exists(key)
+    assert blob_key_from_ref(f"https://cdn.example.com/api/images/{key}/thumb") == key
+
+
+def test_image_url_shape():
+    key = blob_key(b"photo")
+    assert image_url(key, base_url="") == f"/api/images/{key}"
+    assert image_url(key, "thumb", base_url="") == f"/api/images/{key}/thumb"
+    assert image_url(key, "card", base_url="https://api.example.com/") == f"https://api.example.com/api/images/{key}/card"
+    # The URL form round-trips to the key, so clients can send it back
+    assert blob_key_from_ref(image_url(key, "thumb", base_url="https://api.example.com")) == key
+    assert image_url("data:image/png;base64,AAAA") == "data:image/png;base64,AAAA"
@@ -0,0 +1,112 @@
+import asyncio
+
+import bulk
+from bulk import iter_lines, parse_csv, parse_ndjson
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _collect(parser, *chunks):
+    async def run():
+        return [row async for row in parser(_stream(*chunks))]
+    return asyncio.run(run())
+
+
+def _lines(*chunks, max_line_bytes=bulk.BULK_MAX_LINE_BYTES):
+    async def run():
+        return [line async for line in iter_lines(_stream(*chunks), max_line_bytes)]
+    return asyncio.run(run())
+
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    assert _lines(b"ab", b"c\nde", b"f\n", b"g") == [b"abc", b"def", b"g"]
+
+
+def test_iter_lines_drops_overlong_lines():
+    assert _lines(b"12345", b"678\nok\n", b"abcdefgh", max_line_bytes=4) == [None, b"ok", None]
+
+
+def test_ndjson_rows_and_errors():
+    rows = _collect(parse_ndjson, b'{"title": "a"}\n\n[1]\n{bad\n', b'{"title": "b"}')
+    assert [(n, row) for n, row, _ in rows] == [(1, {"title": "a"}), (2, None), (3, None), (4, {"title": "b"})]
+    assert rows[1][2] == "Each line must be a JSON object"
+    assert rows[2][2].startswith("Invalid JSON")
+
+
+def test_ndjson_bad_utf8_is_a_row_error():
+    rows = _collect(parse_ndjson, b'{"title": "a"}\n{"title": "\xff"}\n{"title": "c"}\n')
+    assert rows[0] == (1, {"title": "a"}, None)
+    assert rows[1][:2] == (2, None) and rows[1][2].startswith("Invalid UTF-8")
+    assert rows[2] == (3, {"title": "c"}, None)
+
+
+def test_ndjson_overlong_line_is_a_row_error():
+    long_line = b'{"title": "' + b"x" * bulk.BULK_MAX_LINE_BYTES + b'"}\n'
+    rows = _collect(parse_ndjson, long_line[:1024], long_line[1024:], b'{"a": 1}\n')
+    assert rows == [(1, None, f"Line exceeds {bulk.BULK_MAX_LINE_BYTES} bytes"), (2, {"a": 1}, None)]
+
+
+def test_csv_coerces_cells_and_spans_quoted_newlines():
+    body = (
+        b'\xef\xbb\xbftitle,bedrooms,price_usd,images,description\n'
+        b'Villa,3,250000.5,a.jpg|b.jpg,"two\nlines"\n'
+        b'Flat,,,,\n'
+    )
+    rows = _collect(parse_csv, body[:30], body[30:])
+    assert rows == [
+        (1, {"title": "Villa", "bedrooms": 3, "price_usd": 250000.5,
+             "images": ["a.jpg", "b.jpg"], "description": "two\nlines"}, None),
+        (2, {"title": "Flat", "images": []}, None),
+    ]
+
+
+def test_csv_row_errors():
+    rows = _collect(parse_csv, b'title,bedrooms\nA,x\nB,1,extra\nC,\xff\nD,2\n"open')
+    assert [(n, err is None) for n, _, err in rows] == [(1, False), (2, False), (3, False), (4, True), (5, False)]
+    assert rows[0][2] == "bedrooms: expected an integer, got 'x'"
+    assert rows[1][2] == "Row has more cells than the header"
+    assert rows[2][2].startswith("Invalid UTF-8")
+    assert rows[3][1] == {"title": "D", "bedrooms": 2}
+    assert rows[4][2] == "Unterminated quoted field"
+
+
+def _export_csv(rows, fields):
+    async def run():
+        chunks = [c async for c in bulk.export_rows(_Cursor(rows), dict, "csv", fields, None)]
+        return b"".join(chunks)
+    return asyncio.run(run())
+
+
+def test_csv_export_neutralises_formula_cells():
+    rows = [{"name": "=HYPERLINK(\"http://x\")", "message": "@SUM(A1)", "phone": "+961 1",
+             "note": "\tcmd", "tags": ["-x", "y"], "price": -5, "plain": "hello", "quoted": "'=x"}]
+    lines = _export_csv(rows, rows[0].keys()).decode().splitlines()
+    assert lines[1] == "\"'=HYPERLINK(\"\"http://x\"\")\",'@SUM(A1),+961 1,'\tcmd,'-x|y,-5,hello,''=x"
+
+
+def test_csv_export_round_trips_through_import():
+    rows = [
+        {"title": "+ Sea view", "description": "=SUM(A1)", "owner_phone": "+961 3 123 456",
+         "location": "-Beirut", "bedrooms": 3, "price_usd": -1.5, "images": ["-a.jpg", "b.jpg"]},
+        {"title": "'=quoted", "description": "'+ also quoted", "owner_phone": "(01) 234-567",
+         "location": "@home", "bedrooms": 1, "price_usd": 100.0, "images": []},
+        {"title": "Plain", "description": "'apostrophe", "owner_phone": "-", "location": "Tyre",
+         "bedrooms": 2, "price_usd": 2.0, "images": ["=c.jpg"]},
+    ]
+    body = _export_csv(rows, rows[0].keys())
+    parsed = _collect(parse_csv, body)
+    assert [row for _, row, _ in parsed] == rows
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return _stream(*self._docs)
@@ -0,0 +1,46 @@
+from cache import TTLCache
+
+
+def test_get_set_and_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_set_is_dropped_when_invalidated_during_the_read():
+    cache = TTLCache()
+    version = cache.version()
+    # A write lands while the read's query is in flight
+    cache.invalidate("property")
+    cache.set("property", "pre-write result", version=version)
+    assert cache.get("property") is None
+    assert cache.stats()["stale_sets"] == 1
+
+
+def test_set_is_dropped_after_clear():
+    cache = TTLCache()
+    version = cache.version()
+    cache.clear()
+    cache.set("page", "stale", version=version)
+    assert cache.get("page") is None
+
+
+def test_set_with_current_version_is_kept():
+    cache = TTLCache()
+    cache.set("page", "fresh", version=cache.version())
+    assert cache.get("page") == "fresh"
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+import clustering
+from clustering import (
+    CLUSTER_CACHE_MAX_ZOOM, MAX_BBOX_CELLS, TILE_CELLS, bbox_cells, build_clusters, cell_size, clusters_in_bbox,
+    fit_zoom, tile_bbox, tile_cells, tiles_in_bbox
+)
+
+# Greater Beirut, roughly what a phone shows at zoom 12
+BEIRUT = (33.85, 35.47, 33.92, 35.56)
+# The map tab's default region (0.3 degree deltas around Beirut) and the zoom
+# it derives from it: round(log2(360 / longitudeDelta))
+APP_DEFAULT_BBOX = (33.8938 - 0.15, 35.5018 - 0.15, 33.8938 + 0.15, 35.5018 + 0.15)
+APP_DEFAULT_ZOOM = 10
+
+
+def test_cell_size_halves_per_zoom():
+    assert cell_size(1) == cell_size(0) / 2
+    assert cell_size(99) == cell_size(20)
+
+
+def test_viewport_sized_bbox_keeps_requested_zoom():
+    assert bbox_cells(12, *BEIRUT) <= MAX_BBOX_CELLS
+    assert fit_zoom(12, *BEIRUT) == 12
+
+
+def test_wide_bbox_at_high_zoom_is_clamped():
+    whole_country = (33.0, 35.0, 34.7, 36.7)
+    zoom = fit_zoom(18, *whole_country)
+    assert zoom < 18
+    assert bbox_cells(zoom, *whole_country) <= MAX_BBOX_CELLS
+    assert bbox_cells(zoom + 1, *whole_country) > MAX_BBOX_CELLS
+
+
+def test_world_bbox_fits_at_zoom_zero():
+    assert fit_zoom(20, -90, -180, 90, 180) <= 3
+
+
+def test_clusters_in_bbox_filters_by_centroid():
+    clusters = [{"latitude": 33.9, "longitude": 35.5}, {"latitude": 34.4, "longitude": 35.8}]
+    assert clusters_in_bbox(clusters, *BEIRUT) == clusters[:1]
+
+
+def test_build_clusters_groups_nearby_properties():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["properties"]
+
+    async def run():
+        await collection.insert_many([
+            {"latitude": 33.8901, "longitude": 35.5001, "location": {}, "price_usd": 100.0, "status": "active"},
+            {"latitude": 33.8902, "longitude": 35.5002, "location": {}, "price_usd": 300.0, "status": "active"},
+            {"latitude": 34.4, "longitude": 35.8, "location": {}, "price_usd": 50.0, "status": "active"},
+            {"latitude": 33.8903, "longitude": 35.5003, "location": {}, "price_usd": 1.0, "status": "sold"},
+        ])
+        return await build_clusters(collection, 10, {"status": "active"})
+
+    clusters = sorted(asyncio.run(run()), key=lambda cluster: -cluster["count"])
+    assert [cluster["count"] for cluster in clusters] == [2, 1]
+    assert (clusters[0]["min_price"], clusters[0]["max_price"]) == (100.0, 300.0)
+    assert clusters[0]["property_id"] is None
+    assert clusters[1]["property_id"] is not None
+
+
+def test_app_zoom_is_served_from_tiles():
+    assert APP_DEFAULT_ZOOM > CLUSTER_CACHE_MAX_ZOOM
+    assert fit_zoom(APP_DEFAULT_ZOOM, *APP_DEFAULT_BBOX) == APP_DEFAULT_ZOOM
+    tiles = tiles_in_bbox(APP_DEFAULT_ZOOM, *APP_DEFAULT_BBOX)
+    assert 1 <= len(tiles) <= 4
+    # A small pan reuses the tiles it still overlaps
+    panned = (APP_DEFAULT_BBOX[0] + 0.01, APP_DEFAULT_BBOX[1] + 0.01, APP_DEFAULT_BBOX[2] + 0.01,
+              APP_DEFAULT_BBOX[3] + 0.01)
+    assert set(tiles_in_bbox(APP_DEFAULT_ZOOM, *panned)) <= set(tiles)
+
+
+def test_tiles_align_with_grid_cells():
+    zoom = APP_DEFAULT_ZOOM
+    size = cell_size(zoom)
+    (tile,) = tiles_in_bbox(zoom, 33.9, 35.5, 33.9001, 35.5001)
+    first_x, first_y, end_x, end_y = tile_cells(tile)
+    assert (end_x - first_x, end_y - first_y) == (TILE_CELLS, TILE_CELLS)
+    assert first_x <= (35.5 + 180) // size < end_x
+    assert first_y <= (33.9 + 90) // size < end_y
+    min_lat, min_lng, max_lat, max_lng = tile_bbox(zoom, tile)
+    assert min_lng < first_x * size - 180 and max_lng > end_x * size - 180
+
+
+def test_build_clusters_keeps_only_the_tile_cells():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["properties"]
+    zoom = APP_DEFAULT_ZOOM
+    (tile,) = tiles_in_bbox(zoom, 33.9, 35.5, 33.9001, 35.5001)
+    first_x, _, end_x, _ = tile_cells(tile)
+    inside = first_x * cell_size(zoom) - 180 + cell_size(zoom) / 2
+    outside = end_x * cell_size(zoom) - 180 + cell_size(zoom) / 2
+
+    async def run():
+        await collection.insert_many([
+            {"latitude": 33.9, "longitude": inside, "location": {}, "price_usd": 1.0, "status": "active"},
+            {"latitude": 33.9, "longitude": outside, "location": {}, "price_usd": 1.0, "status": "active"},
+        ])
+        return await build_clusters(collection, zoom, {"status": "active"}, tile_cells(tile))
+
+    clusters = asyncio.run(run())
+    assert [cluster["longitude"] for cluster in clusters] == [inside]
+
+
+def test_clusters_endpoint_caches_tiles_at_app_zoom(api, server, monkeypatch):
+    builds = []
+
+    async def fake_build(collection, zoom, tile, match):
+        builds.append((zoom, tile))
+        return [{"latitude": 33.9, "longitude": 35.5, "count": 3, "min_price": 1.0, "max_price": 2.0,
+                 "property_id": None}]
+
+    monkeypatch.setattr(clustering, "build_tile_clusters", fake_build)
+    min_lat, min_lng, max_lat, max_lng = APP_DEFAULT_BBOX
+    params = {"zoom": APP_DEFAULT_ZOOM, "min_lat": min_lat, "min_lng": min_lng,
+              "max_lat": max_lat, "max_lng": max_lng}
+
+    response = api.get("/api/properties/clusters", params=params)
+    assert response.status_code == 200
+    assert response.headers["x-cluster-zoom"] == str(APP_DEFAULT_ZOOM)
+    assert response.json()[0]["count"] == 3
+    first_builds = len(builds)
+    assert first_builds == len(tiles_in_bbox(APP_DEFAULT_ZOOM, *APP_DEFAULT_BBOX))
+
+    # Reloading the same region and panning within its tiles build nothing
+    assert api.get("/api/properties/clusters", params=params).status_code == 200
+    panned = {**params, "min_lat": min_lat + 0.01, "max_lat": max_lat + 0.01}
+    assert api.get("/api/properties/clusters", params=panned).status_code == 200
+    assert len(builds) == first_builds
+    # Panning onto a new tile builds only that tile
+    far = {**params, "min_lng": min_lng + 2, "max_lng": max_lng + 2}
+    assert api.get("/api/properties/clusters", params=far).status_code == 200
+    new_tiles = set(tiles_in_bbox(APP_DEFAULT_ZOOM, min_lat, min_lng + 2, max_lat, max_lng + 2))
+    assert len(builds) == first_builds + len(new_tiles)
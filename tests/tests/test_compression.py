@@ -0,0 +1,77 @@
+import asyncio
+import gzip
+
+from compression import CompressionMiddleware, choose_encoding, compress, supported_encodings, weaken_etag
+
+
+def test_choose_encoding_prefers_br_then_gzip():
+    assert choose_encoding("gzip, deflate, br") == supported_encodings()[0]
+    assert choose_encoding("gzip") == "gzip"
+
+
+def test_choose_encoding_honours_q_zero_and_wildcard():
+    assert choose_encoding("br;q=0, gzip;q=0") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") == supported_encodings()[0]
+    assert choose_encoding("*, br;q=0") == "gzip"
+    assert choose_encoding("gzip;q=bogus") is None
+
+
+def test_weaken_etag_is_idempotent():
+    assert weaken_etag('"abc"') == 'W/"abc"'
+    assert weaken_etag('W/"abc"') == 'W/"abc"'
+
+
+def run_app(body_chunks, headers, accept_encoding="gzip"):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(body_chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(body_chunks) - 1})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    response_headers = {k.decode().lower(): v.decode() for k, v in messages[0]["headers"]}
+    return response_headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+JSON = [(b"content-type", b"application/json")]
+
+
+def test_compressed_response_gets_weak_etag_and_vary():
+    body = b'{"items": []}' * 50
+    headers, sent = run_app([body], JSON + [(b"etag", b'"abc"')])
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"] == 'W/"abc"'
+    assert headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(sent) == body
+
+
+def test_small_body_is_sent_as_is():
+    headers, sent = run_app([b"{}"], JSON + [(b"etag", b'"abc"')])
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"abc"'
+    assert sent == b"{}"
+
+
+def test_already_encoded_and_binary_responses_pass_through():
+    encoded = compress(b"x" * 500, "gzip")
+    headers, sent = run_app([encoded], JSON + [(b"content-encoding", b"gzip")])
+    assert sent == encoded
+    headers, sent = run_app([b"\xff" * 500], [(b"content-type", b"image/jpeg")])
+    assert "content-encoding" not in headers
+
+
+def test_streamed_body_is_compressed_incrementally():
+    chunks = [b'{"row": %d}\n' % i for i in range(200)]
+    headers, sent = run_app(chunks, [(b"content-type", b"text/csv"), (b"content-length", b"9999")])
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(sent) == b"".join(chunks)
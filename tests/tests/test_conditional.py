@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from conditional import http_date, is_not_modified, make_etag, validator_headers
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_make_etag_is_stable_and_quoted():
+    assert make_etag(["a", "b"]) == make_etag(["a", "b"])
+    assert make_etag(["a", "b"]) != make_etag(["a", "c"])
+    assert make_etag(["a"]).startswith('"') and make_etag(["a"]).endswith('"')
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag(["row"])
+    assert is_not_modified(_request(if_none_match=etag), etag)
+    assert is_not_modified(_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert is_not_modified(_request(if_none_match="*"), etag)
+    assert not is_not_modified(_request(if_none_match='"other"'), etag)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    modified = datetime(2024, 5, 1, 12, 0, 0, 500000)
+    since = http_date(datetime(2024, 5, 1, 12, 0, 0))
+    etag = make_etag(["row"])
+    assert is_not_modified(_request(if_modified_since=since), etag, modified)
+    assert not is_not_modified(_request(if_modified_since=http_date(datetime(2024, 5, 1, 11))), etag, modified)
+    assert not is_not_modified(_request(if_modified_since="not a date"), etag, modified)
+    # Without a Last-Modified there is nothing to compare the date against
+    assert not is_not_modified(_request(if_modified_since=since), etag)
+    # If-None-Match wins over If-Modified-Since
+    assert not is_not_modified(_request(if_none_match='"other"', if_modified_since=since), etag, modified)
+
+
+def test_validator_headers():
+    modified = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    assert validator_headers('"x"', modified) == {
+        "ETag": '"x"', "Cache-Control": "no-cache", "Last-Modified": "Wed, 01 May 2024 12:00:00 GMT",
+    }
+    assert "Last-Modified" not in validator_headers('"x"')
+
+
+def test_list_pages_revalidate_by_etag_only(api, admin_headers, make_property):
+    first = make_property(title="First")
+    make_property(title="Second")
+    response = api.get("/api/properties/summary")
+    assert "last-modified" not in response.headers
+    etag = response.headers["etag"]
+    assert api.get("/api/properties/summary", headers={"If-None-Match": etag}).status_code == 304
+
+    # The newest row stays, so a max(updated_at) validator would not move
+    assert api.delete(f"/api/properties/{first['id']}", headers=admin_headers).status_code == 200
+    response = api.get("/api/properties/summary", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["items"]] == ["Second"]
+    since = http_date(datetime.now(timezone.utc))
+    assert api.get("/api/properties/summary", headers={"If-Modified-Since": since}).status_code == 200
+
+
+def test_detail_keeps_last_modified(api, make_property):
+    created = make_property()
+    response = api.get(f"/api/properties/{created['id']}")
+    assert "last-modified" in response.headers
+    since = response.headers["last-modified"]
+    assert api.get(f"/api/properties/{created['id']}", headers={"If-Modified-Since": since}).status_code == 304
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import timedelta
+
+from pymongo import monitoring
+
+import diagnostics
+from diagnostics import QueryRecorder, SlowRequestMiddleware, command_shape, explainable, query_shape
+
+
+def test_query_shape_drops_values_and_repeats():
+    query = {"area": "Beirut", "price_usd": {"$gte": 5, "$lt": 10}, "$or": [{"a": 1}, {"a": 2}, {"b": "x"}]}
+    assert query_shape(query) == {
+        "area": "?", "price_usd": {"$gte": "?", "$lt": "?"}, "$or": [{"a": "?"}, {"b": "?"}],
+    }
+    assert query_shape({"_id": {"$in": [1, 2, 3]}}) == {"_id": {"$in": ["?"]}}
+
+
+def test_command_shapes():
+    assert command_shape("find", {"filter": {"a": 1}, "sort": {"created_at": -1, "_id": -1}}) == {
+        "filter": {"a": "?"}, "sort": ["created_at", "_id"],
+    }
+    assert command_shape("aggregate", {"pipeline": [{"$match": {"a": 1}}, {"$limit": 5}]}) == {
+        "pipeline": [{"$match": {"a": "?"}}, {"$limit": "?"}],
+    }
+    assert command_shape("update", {"updates": [{"q": {"_id": 1}, "u": {}}]}) == {"filter": {"_id": "?"}}
+    assert command_shape("insert", {"documents": [{"a": 1}]}) is None
+
+
+def test_explainable_strips_driver_fields_and_skips_writes():
+    command = {"find": "properties", "filter": {}, "lsid": {}, "$db": "test", "readConcern": {}}
+    assert explainable("find", command) == {"find": "properties", "filter": {}}
+    assert explainable("insert", {"insert": "leads", "documents": []}) is None
+    assert explainable("aggregate", {"aggregate": "leads", "pipeline": [{"$merge": "x"}]}) is None
+
+
+def _record(recorder, request_id, command):
+    name = next(iter(command))
+    recorder.started(monitoring.CommandStartedEvent({**command, "$db": "test"}, "test", request_id, ("h", 1), 1))
+    recorder.succeeded(monitoring.CommandSucceededEvent(
+        timedelta(milliseconds=request_id), {"ok": 1}, name, request_id, ("h", 1), 1
+    ))
+
+
+def test_recorder_keeps_only_explainable_commands():
+    recorder = QueryRecorder()
+    commands = []
+    token = diagnostics.request_commands.set(commands)
+    try:
+        _record(recorder, 1, {"insert": "properties", "documents": [{"title": "x" * 1000}] * 100})
+        _record(recorder, 2, {"find": "properties", "filter": {"area": "Beirut"}})
+    finally:
+        diagnostics.request_commands.reset(token)
+    insert, find = commands
+    assert insert["explain"] is None and "document" not in insert
+    assert insert["ms"] == 1.0
+    assert find["explain"] == {"find": "properties", "filter": {"area": "Beirut"}}
+    assert find["shape"] == {"filter": {"area": "?"}, "sort": []}
+
+
+def test_explain_tasks_are_held_until_done(monkeypatch):
+    finished = []
+
+    class Middleware(SlowRequestMiddleware):
+        async def explain(self, route, record, command):
+            await asyncio.sleep(0)
+            finished.append(command)
+
+    async def run():
+        middleware = Middleware(None, client=None, threshold_ms=1, explain_rate=1)
+        monkeypatch.setattr(diagnostics.random, "random", lambda: 0)
+        middleware.report("GET /api/properties", 5, 200, [
+            {"collection": "properties", "command": "find", "shape": {}, "ms": 3.0, "explain": {"find": "properties"}},
+            {"collection": "properties", "command": "insert", "shape": None, "ms": 9.0, "explain": None},
+        ])
+        assert len(middleware._explain_tasks) == 1
+        await asyncio.gather(*middleware._explain_tasks)
+        return middleware
+
+    middleware = asyncio.run(run())
+    assert finished == [{"find": "properties"}]
+    assert not middleware._explain_tasks
@@ -0,0 +1,119 @@
+import struct
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from blob_store import BlobError
+from image_validation import ImagePolicy, ImageTooLarge, UploadSizeLimitMiddleware, image_dimensions
+
+
+def _png(width, height):
+    ihdr = struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr
+
+
+def _jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x03" + b"\x00" * 9
+    return b"\xff\xd8" + app0 + sof0 + b"\xff\xd9"
+
+
+def _webp_vp8x(width, height):
+    body = b"VP8X" + struct.pack("<I", 10) + b"\x00" * 4 + (width - 1).to_bytes(3, "little") \
+        + (height - 1).to_bytes(3, "little")
+    return b"RIFF" + struct.pack("<I", len(body) + 4) + b"WEBP" + body
+
+
+def test_image_dimensions_reads_headers():
+    assert image_dimensions(_png(640, 480)) == (640, 480)
+    assert image_dimensions(_jpeg(1024, 768)) == (1024, 768)
+    assert image_dimensions(_webp_vp8x(300, 200)) == (300, 200)
+    assert image_dimensions(b"GIF89a" + b"\x00" * 32) is None
+    assert image_dimensions(b"\xff\xd8\xff\x00truncated") is None
+
+
+def _policy(**overrides):
+    options = dict(max_image_bytes=1024, max_property_bytes=2048, max_images=2,
+                   max_dimension=1000, min_dimension=10, allowed_types=["image/png", "image/jpeg"])
+    options.update(overrides)
+    return ImagePolicy(**options)
+
+
+def test_policy_checks_size_type_and_dimensions():
+    policy = _policy()
+    policy.check_image(_png(100, 100))
+    with pytest.raises(ImageTooLarge):
+        policy.check_image(_png(100, 100) + b"\x00" * 2048)
+    with pytest.raises(BlobError, match="Unsupported"):
+        policy.check_image(_webp_vp8x(100, 100))
+    with pytest.raises(BlobError, match="longest side"):
+        policy.check_image(_jpeg(4000, 100))
+    with pytest.raises(BlobError, match="shortest side"):
+        policy.check_image(_png(100, 5))
+
+
+def test_policy_sizes_base64_before_decoding():
+    policy = _policy()
+    policy.check_encoded("data:image/png;base64," + "A" * 1364)
+    with pytest.raises(ImageTooLarge):
+        policy.check_encoded("data:image/png;base64," + "A" * 1400)
+
+
+def test_policy_gallery_budget():
+    policy = _policy()
+    policy.check_gallery([1024, 1024])
+    with pytest.raises(BlobError, match="at most 2 images"):
+        policy.check_gallery([1, 1, 1])
+    with pytest.raises(ImageTooLarge):
+        policy.check_gallery([1024, 1025])
+
+
+class Upload(BaseModel):
+    data: str
+
+
+def _client(max_bytes=1000):
+    app = FastAPI()
+
+    @app.post("/api/upload")
+    async def upload(payload: Upload):
+        return {"size": len(payload.data)}
+
+    @app.post("/api/properties/bulk")
+    async def bulk(payload: Upload):
+        return {"size": len(payload.data)}
+
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=max_bytes, exempt_paths=["/api/properties/bulk"])
+    return TestClient(app)
+
+
+def _chunked(body, size=100):
+    def chunks():
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+    return chunks()
+
+
+def test_declared_length_over_limit_is_rejected():
+    r = _client().post("/api/upload", json={"data": "x" * 2000})
+    assert r.status_code == 413
+
+
+def test_chunked_body_over_limit_is_rejected():
+    client = _client()
+    body = b'{"data": "' + b"x" * 2000 + b'"}'
+    r = client.post("/api/upload", content=_chunked(body), headers={"content-type": "application/json"})
+    assert r.status_code == 413
+    assert r.json() == {"detail": "Request body too large"}
+
+
+def test_chunked_body_within_limit_and_exempt_paths_pass():
+    client = _client()
+    small = b'{"data": "' + b"x" * 500 + b'"}'
+    r = client.post("/api/upload", content=_chunked(small), headers={"content-type": "application/json"})
+    assert r.json() == {"size": 500}
+    large = b'{"data": "' + b"x" * 2000 + b'"}'
+    r = client.post("/api/properties/bulk", content=_chunked(large), headers={"content-type": "application/json"})
+    assert r.json() == {"size": 2000}
@@ -0,0 +1,43 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from blob_store import LocalBlobStore
+from image_variants import VARIANTS, VariantWorker
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _jpeg(size):
+    out = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(out, "JPEG")
+    return out.getvalue()
+
+
+def test_generate_renders_each_missing_variant_once(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    key = store.put(_jpeg((2000, 1000)))
+    worker = VariantWorker(store)
+    try:
+        assert worker.generate(key) == len(VARIANTS)
+        assert worker.generate(key) == 0
+        for name, (max_edge, _) in VARIANTS.items():
+            with Image.open(io.BytesIO(b"".join(store.iter_chunks(key, variant=name)))) as img:
+                assert max(img.size) == max_edge
+        assert worker.stats()["generated"] == len(VARIANTS)
+    finally:
+        worker.shutdown()
+
+
+def test_counters_are_exact_across_threads(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    keys = [store.put(b"not an image %d" % n) for n in range(40)]
+    worker = VariantWorker(store)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(worker.generate, keys))
+        stats = worker.stats()
+        assert stats["generated"] == stats["failed"] == len(keys) * len(VARIANTS)
+    finally:
+        worker.shutdown()
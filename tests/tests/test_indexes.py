@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from indexes import INDEXES, QUERY_SHAPES, RETIRED_INDEXES, ensure_indexes, summarize_explain
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+
+
+def _esr_index(collection, query_filter, sort):
+    """Name of an index keyed equality -> sort -> range for this shape, if any."""
+    equality = {field for field, value in query_filter.items() if not isinstance(value, dict)}
+    ranges = {field for field, value in query_filter.items()
+              if isinstance(value, dict) and set(value) <= RANGE_OPERATORS}
+    # A range on a sort field is bounded by the sort keys themselves
+    ranges -= {field for field, _ in sort}
+    for model in INDEXES[collection]:
+        keys = list(model.document["key"].items())
+        eq_keys = {field for field, _ in keys[:len(equality)]}
+        sort_keys = keys[len(equality):len(equality) + len(sort)]
+        range_keys = {field for field, _ in keys[len(equality) + len(sort):]}
+        if eq_keys == equality and sort_keys == list(sort) and ranges <= range_keys:
+            return model.document["name"]
+    return None
+
+
+@pytest.mark.parametrize("shape", [
+    shape for shape in QUERY_SHAPES
+    if shape["sort"] and not any(key.startswith("$") for key in shape["filter"])
+], ids=lambda shape: shape["name"])
+def test_sorted_shapes_have_an_esr_index(shape):
+    assert _esr_index(shape["collection"], shape["filter"], shape["sort"]) is not None
+
+
+def test_price_range_pages_are_sorted_by_the_index():
+    shape = next(s for s in QUERY_SHAPES if s["name"] == "get_properties (price range)")
+    assert _esr_index("properties", shape["filter"], shape["sort"]) == "status_created_at_id_price"
+
+
+def test_summarize_explain_flags_in_memory_sorts():
+    explain = {
+        "queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status_price"},
+        }}},
+        "executionStats": {"totalDocsExamined": 50, "totalKeysExamined": 50, "nReturned": 20},
+    }
+    assert summarize_explain(explain) == {
+        "index": "status_price", "collection_scan": False, "in_memory_sort": True,
+        "docs_examined": 50, "keys_examined": 50, "returned": 20,
+    }
+
+
+def test_ensure_indexes_drops_retired_indexes():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+
+    async def run():
+        await db.properties.create_index([("status", 1), ("price_usd", 1)], name="status_price")
+        await ensure_indexes(db)
+        return await db.properties.index_information()
+
+    names = set(asyncio.run(run()))
+    assert not names & set(RETIRED_INDEXES["properties"])
+    assert "status_created_at_id_price" in names
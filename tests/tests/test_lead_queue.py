@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from lead_queue import LeadQueue
+
+
+class FakeLeads:
+    def __init__(self):
+        self.docs = []
+        self.batches = []
+        self.gate = None
+        self.started = asyncio.Event()
+        self.fail_with = None
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(len(docs))
+        self.started.set()
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.docs.extend(docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+def _lead(n):
+    return {"_id": n, "property_id": f"p{n % 2}"}
+
+
+def test_submits_are_grouped_into_batches():
+    async def run():
+        leads = FakeLeads()
+        written = []
+        queue = LeadQueue(leads, enabled=True, flush_interval=10, max_batch=3, on_written=written.append)
+        queue.start()
+        await asyncio.wait_for(asyncio.gather(*(queue.submit(_lead(n)) for n in range(5))), 1)
+        await queue.stop()
+        return leads, written, queue.stats()
+
+    leads, written, stats = asyncio.run(run())
+    assert leads.batches == [3, 2]
+    assert written == [3, 2]
+    assert len(leads.docs) == 5
+    assert stats["queued"] == 5 and stats["written"] == 5 and not stats["running"]
+
+
+def test_disabled_queue_inserts_directly():
+    async def run():
+        leads = FakeLeads()
+        queue = LeadQueue(leads)
+        queue.start()
+        await queue.submit(_lead(1))
+        return leads, queue.stats()
+
+    leads, stats = asyncio.run(run())
+    assert leads.docs == [_lead(1)] and leads.batches == []
+    assert stats["direct_inserts"] == 1
+
+
+def test_stop_waits_for_the_batch_being_written():
+    async def run():
+        leads = FakeLeads()
+        leads.gate = asyncio.Event()
+        queue = LeadQueue(leads, enabled=True, flush_interval=10, max_batch=2)
+        queue.start()
+        callers = [asyncio.ensure_future(queue.submit(_lead(n))) for n in range(2)]
+        await asyncio.wait_for(leads.started.wait(), 1)
+        stopping = asyncio.ensure_future(queue.stop())
+        await asyncio.sleep(0)
+        # Submitted while stopping: goes straight to insert_one
+        await queue.submit(_lead(9))
+        leads.gate.set()
+        await asyncio.wait_for(asyncio.gather(stopping, *callers), 1)
+        return leads
+
+    leads = asyncio.run(run())
+    assert sorted(doc["_id"] for doc in leads.docs) == [0, 1, 9]
+
+
+def test_failed_writes_reach_ack_callers():
+    async def run():
+        leads = FakeLeads()
+        leads.fail_with = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+        queue = LeadQueue(leads, enabled=True, flush_interval=10, max_batch=2)
+        queue.start()
+        results = await asyncio.wait_for(
+            asyncio.gather(*(queue.submit(_lead(n)) for n in range(2)), return_exceptions=True), 1
+        )
+        await queue.stop()
+        return results, queue.stats()
+
+    results, stats = asyncio.run(run())
+    assert results[0] is None
+    assert isinstance(results[1], PyMongoError)
+    assert stats["failed"] == 1 and stats["written"] == 1
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_buffered_mode_reports_only_stored_leads(fails):
+    async def run():
+        leads = FakeLeads()
+        leads.fail_with = PyMongoError("down") if fails else None
+        inserted = []
+
+        async def on_inserted(docs):
+            inserted.extend(docs)
+
+        queue = LeadQueue(leads, enabled=True, flush_interval=10, max_batch=10,
+                          durability="buffered", on_inserted=on_inserted)
+        queue.start()
+        for n in range(3):
+            await queue.submit(_lead(n))
+        assert inserted == []
+        await queue.stop()
+        return inserted
+
+    inserted = asyncio.run(run())
+    assert inserted == ([] if fails else [_lead(n) for n in range(3)])
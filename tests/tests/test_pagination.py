@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from pagination import InvalidCursor, apply_cursor, clamp_page_size, decode_cursor, encode_cursor, fetch_page
+
+
+def test_cursor_round_trips_datetimes_numbers_and_null():
+    oid = ObjectId()
+    created = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor({"_id": oid, "created_at": created})) == (created, oid)
+    doc = {"_id": oid, "lead_counts": {"total": 7}}
+    assert decode_cursor(encode_cursor(doc, "lead_counts.total")) == (7, oid)
+    assert decode_cursor(encode_cursor({"_id": oid}, "lead_counts.total")) == (None, oid)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "eyJ2IjogdHJ1ZSwgImkiOiAieCJ9", "e30"])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_apply_cursor_keeps_missing_values_after_numbers():
+    oid = ObjectId()
+    query = apply_cursor({"status": "active"}, encode_cursor({"_id": oid, "n": 3}, "n"), "n")
+    assert query == {"$and": [{"status": "active"}, {"$or": [
+        {"n": {"$lt": 3}}, {"n": 3, "_id": {"$lt": oid}}, {"n": None},
+    ]}]}
+    assert apply_cursor({}, encode_cursor({"_id": oid}, "n"), "n") == {"n": None, "_id": {"$lt": oid}}
+
+
+def test_clamp_page_size():
+    assert clamp_page_size(None) > 0
+    assert clamp_page_size(-5) == 1
+    assert clamp_page_size(10 ** 6) <= 100
+
+
+def test_pages_cover_documents_missing_the_sort_field():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["test"]["properties"]
+    docs = [{"lead_counts": {"total": n}} for n in (5, 3, 3, 0)] + [{}, {"lead_counts": {}}, {}]
+
+    async def run():
+        await collection.insert_many(docs)
+        seen, cursor = [], None
+        while True:
+            page, cursor = await fetch_page(collection, {}, cursor, 2, sort_field="lead_counts.total")
+            seen.extend(page)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(run())
+    assert len(seen) == len(docs)
+    assert len({doc["_id"] for doc in seen}) == len(docs)
+    assert [doc.get("lead_counts", {}).get("total") for doc in seen][:4] == [5, 3, 3, 0]
@@ -0,0 +1,181 @@
+import base64
+import struct
+from urllib.parse import quote
+
+
+def _png_data_uri(width=100, height=100):
+    ihdr = struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+    png = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr
+    return "data:image/png;base64," + base64.b64encode(png).decode()
+
+
+def _key(url):
+    return url.rsplit("/", 1)[-1]
+
+
+def _images_url(prop, suffix=""):
+    return f"/api/properties/{prop['id']}/images{suffix}"
+
+
+def _gallery(api, prop):
+    return [_key(url) for url in api.get(f"/api/properties/{prop['id']}").json()["images"]]
+
+
+def test_summaries_serve_card_covers_and_thumb_tiles(api, make_property):
+    created = make_property(images=[_png_data_uri()])
+    key = _key(created["images"][0])
+    item = api.get("/api/properties/summary").json()["items"][0]
+    assert item["cover_image"].endswith(f"/api/images/{key}/card")
+    assert item["cover_thumb"].endswith(f"/api/images/{key}/thumb")
+    listed = api.get("/api/properties").json()["items"][0]
+    assert listed["images"] == [item["cover_image"]]
+
+
+def test_append_inserts_new_images_and_skips_repeats(api, admin_headers, make_property):
+    prop = make_property(images=[_png_data_uri(100)])
+    first = _key(prop["images"][0])
+    response = api.post(_images_url(prop), headers=admin_headers,
+                        json={"images": [_png_data_uri(101), _png_data_uri(100)], "position": 0})
+    assert response.status_code == 200
+    added, kept = [_key(url) for url in response.json()["images"]]
+    assert kept == first and added != first
+
+    response = api.post(_images_url(prop), headers=admin_headers, json={"images": [_png_data_uri(100)]})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Images are already on this property"
+
+
+def _race(server, monkeypatch, prop, pushed):
+    """Land ``pushed`` on the property between the append's read and its write."""
+    store_images = server.store_images
+
+    async def racing_store_images(images, existing=()):
+        keys = await store_images(images, existing)
+        await server.db.properties.update_one({"_id": server.ObjectId(prop["id"])},
+                                              {"$push": {"images": {"$each": pushed or keys}}})
+        return keys
+
+    monkeypatch.setattr(server, "store_images", racing_store_images)
+
+
+def test_append_racing_the_same_image_does_not_duplicate_it(api, admin_headers, make_property, server, monkeypatch):
+    prop = make_property()
+    _race(server, monkeypatch, prop, pushed=None)
+    response = api.post(_images_url(prop), headers=admin_headers, json={"images": [_png_data_uri()]})
+    assert response.status_code == 409
+    assert len(_gallery(api, prop)) == 1
+
+
+def test_append_racing_past_the_gallery_cap_is_rejected(api, admin_headers, make_property, server, monkeypatch):
+    monkeypatch.setattr(server.image_policy, "max_images", 2)
+    prop = make_property(images=[_png_data_uri(100)])
+    _race(server, monkeypatch, prop, pushed=["f" * 64])
+    response = api.post(_images_url(prop), headers=admin_headers, json={"images": [_png_data_uri(101)]})
+    assert response.status_code == 409
+    assert len(_gallery(api, prop)) == 2
+
+
+def test_remove_by_url_and_stale_refs(api, admin_headers, make_property):
+    prop = make_property(images=[_png_data_uri(100), _png_data_uri(101)])
+    first, second = prop["images"]
+    response = api.delete(_images_url(prop, "/" + quote(first, safe="")), headers=admin_headers)
+    assert response.status_code == 200
+    assert [_key(url) for url in response.json()["images"]] == [_key(second)]
+
+    response = api.delete(_images_url(prop, "/" + quote(first, safe="")), headers=admin_headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Image not found on property"
+    assert api.delete(_images_url(prop, "/5"), headers=admin_headers).status_code == 404
+
+
+def test_reorder_by_keys_and_stale_orders(api, admin_headers, make_property):
+    prop = make_property(images=[_png_data_uri(100), _png_data_uri(101)])
+    first, second = prop["images"]
+    response = api.put(_images_url(prop, "/order"), headers=admin_headers, json={"order": [second, first]})
+    assert response.status_code == 200
+    assert [_key(url) for url in response.json()["images"]] == [_key(second), _key(first)]
+
+    # A key that is no longer on the property, or an order sized for another gallery
+    stale = api.put(_images_url(prop, "/order"), headers=admin_headers, json={"order": [second, "f" * 64]})
+    assert stale.status_code == 409
+    assert stale.json()["detail"] == "Images changed; reload and retry"
+    assert api.put(_images_url(prop, "/order"), headers=admin_headers, json={"order": [2, 0, 1]}).status_code == 409
+    assert _gallery(api, prop) == [_key(second), _key(first)]
+
+
+MINIMAL = {"Prefer": "return=minimal"}
+
+
+def test_create_with_return_minimal_sends_location_and_etag(api, admin_headers, make_property):
+    payload = {k: v for k, v in make_property().items() if k in (
+        "title", "area", "location_detail", "price_usd", "property_type", "size_sqm", "description")}
+    response = api.post("/api/properties", headers={**admin_headers, **MINIMAL}, json=payload)
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["preference-applied"] == "return=minimal"
+    location = response.headers["location"]
+    assert location.startswith("/api/properties/")
+    # The ETag from the write is the one a read of the new property produces
+    assert api.get(location, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    response = api.post("/api/properties", headers=admin_headers, json=payload)
+    assert response.status_code == 200
+    assert response.json()["title"] == payload["title"]
+    assert "preference-applied" not in response.headers
+
+
+def test_update_with_and_without_return_minimal(api, admin_headers, make_property):
+    prop = make_property(images=[_png_data_uri()])
+    url = f"/api/properties/{prop['id']}"
+    response = api.put(url, headers={**admin_headers, **MINIMAL}, json={"title": "Renamed"})
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["preference-applied"] == "return=minimal"
+    assert api.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    response = api.put(url, headers=admin_headers, json={"price_usd": 1000})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["title"], body["price_usd"], body["images"]) == ("Renamed", 1000, prop["images"])
+    assert "preference-applied" not in response.headers
+
+
+def test_lead_status_update_with_and_without_return_minimal(api, admin_headers, make_property):
+    prop = make_property()
+    lead = api.post("/api/leads", json={"property_id": prop["id"], "name": "Rana", "phone": "+961 3 123 456"}).json()
+    url = f"/api/leads/{lead['id']}"
+    response = api.put(url, headers={**admin_headers, **MINIMAL}, json={"status": "contacted"})
+    assert response.status_code == 204
+    assert response.headers["preference-applied"] == "return=minimal"
+
+    response = api.put(url, headers=admin_headers, json={"status": "completed"})
+    assert response.status_code == 200
+    assert (response.json()["id"], response.json()["status"]) == (lead["id"], "completed")
+
+
+def _live_login(client):
+    client.post("/api/auth/create-admin", params={"email": "admin@example.com", "password": "secret"})
+    token = client.post("/api/auth/login", json={"email": "admin@example.com", "password": "secret"}).json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _live_property(client, headers, images):
+    payload = {
+        "title": "Sea view apartment", "area": "Beirut", "location_detail": "Hamra", "price_usd": 250000,
+        "property_type": "Apartment", "size_sqm": 120, "description": "Bright and quiet", "images": images,
+    }
+    return client.post("/api/properties", headers=headers, json=payload).json()
+
+
+def test_splice_and_reorder_by_index(live_api):
+    # Both are pipeline updates, which mongomock does not evaluate
+    headers = _live_login(live_api)
+    prop = _live_property(live_api, headers, [_png_data_uri(100 + n) for n in range(3)])
+    keys = [_key(url) for url in prop["images"]]
+
+    response = live_api.put(_images_url(prop, "/order"), headers=headers, json={"order": [2, 0, 1]})
+    assert [_key(url) for url in response.json()["images"]] == [keys[2], keys[0], keys[1]]
+
+    response = live_api.delete(_images_url(prop, "/1"), headers=headers)
+    assert [_key(url) for url in response.json()["images"]] == [keys[2], keys[1]]
+    assert live_api.delete(_images_url(prop, "/2"), headers=headers).status_code == 404
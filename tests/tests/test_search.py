@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from pagination import InvalidCursor
+from search import PRICE_BUCKETS, _price_buckets, price_facet, run_search, search_pipeline
+
+
+def test_price_buckets_are_labelled_by_range():
+    groups = [{"_id": PRICE_BUCKETS[0], "count": 2}, {"_id": "above", "count": 1}]
+    assert _price_buckets(groups) == [
+        {"min": PRICE_BUCKETS[0], "max": PRICE_BUCKETS[1], "count": 2},
+        {"min": PRICE_BUCKETS[-1], "max": None, "count": 1},
+    ]
+
+
+def test_text_query_is_the_first_match_stage():
+    pipeline = search_pipeline("sea view", {"status": "active"}, 20, {"title": 1})
+    assert pipeline[0] == {"$match": {"$text": {"$search": "sea view"}, "status": "active"}}
+
+
+def test_prices_below_lowest_boundary_are_not_counted_as_above():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["properties"]
+
+    async def run():
+        await collection.insert_many([
+            {"price_usd": PRICE_BUCKETS[0] - 500},
+            {"price_usd": PRICE_BUCKETS[0] + 1},
+            {"price_usd": PRICE_BUCKETS[-1] + 1},
+        ])
+        return await collection.aggregate(price_facet()).to_list(None)
+
+    counts = {group["_id"]: group["count"] for group in asyncio.run(run())}
+    assert counts == {PRICE_BUCKETS[0]: 2, "above": 1}
+
+
+class _HitsOnly:
+    """Runs just the hits branch of a search pipeline; mongomock has no $text or $facet."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def aggregate(self, pipeline):
+        hits = self.collection.aggregate(pipeline[-1]["$facet"]["hits"])
+        return _Result(hits)
+
+
+class _Result:
+    def __init__(self, hits):
+        self.hits = hits
+
+    async def to_list(self, length):
+        return [{"hits": await self.hits.to_list(None), "total": [{"count": 0}]}]
+
+
+@pytest.mark.parametrize("q", [None, "sea view"])
+def test_search_pages_through_every_match_once(q):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["properties"]
+    start = datetime(2026, 1, 1)
+    # Scores and dates repeat so pages have to split ties on _id
+    docs = [{"title": f"p{n}", "score": float(n % 3), "created_at": start + timedelta(days=n % 4)}
+            for n in range(11)]
+
+    async def run():
+        await collection.insert_many(docs)
+        seen, cursor = [], None
+        while True:
+            page = await run_search(_HitsOnly(collection), q, {}, 4, {"title": 1, "created_at": 1}, cursor)
+            seen.append([hit["title"] for hit in page["hits"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return seen
+
+    pages = asyncio.run(run())
+    assert [len(page) for page in pages] == [4, 4, 3]
+    field = "score" if q else "created_at"
+    expected = sorted(docs, key=lambda doc: (doc[field], doc["_id"]), reverse=True)
+    assert sum(pages, []) == [doc["title"] for doc in expected]
+
+
+def test_malformed_search_cursor_is_rejected():
+    with pytest.raises(InvalidCursor):
+        search_pipeline(None, {}, 20, {"title": 1}, cursor="not-a-cursor")